@@ -0,0 +1,203 @@
+# Benchmarks TextFormatter against the closure-based format_text it replaced
+# (copied below verbatim as the reference) and checks both produce the same
+# output. Run from the repo root:
+#   python common/bench_text_formatter.py [--pages N] [--depth N]
+import sys
+import timeit
+import random
+import argparse
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from text_formatter import TextFormatter
+
+SAMHSA_URL = "https://www.samhsa.gov"
+ETM_URL = "https://www.equaltreatmentmd.org"
+SAMHSA_FILTER_TEXT = {'body', 'intro', 'hero', 'expand all', 'collapse all', 'skip to main content',
+                      'title', 'last updated', 'last updated:', 'spanish language toggle', 'español',
+                      'breadcrumbs', 'your browser is not supported',
+                      'switch to chrome, edge, firefox or safari', 'main page content', 'source'}
+
+def legacy_samhsa_format_text(element):
+    lines = []
+    pdf_links = []
+    filter_text = SAMHSA_FILTER_TEXT
+
+    def recurse(node, indent=""):
+        if isinstance(node, NavigableString):
+            text = node.strip()
+            if text and text.lower() not in filter_text and not (text.startswith(f) for f in filter_text):
+                lines.append(indent + text)
+
+        elif isinstance(node, Tag):
+            name = node.name.lower()
+
+            if name in ['script', 'style', 'nav', 'footer']:
+                return  # skip
+
+            if name.startswith('h') and name[1:].isdigit():
+                heading = get_text_with_links(node).strip()
+                lines.append('\n' + heading)
+                lines.append('-' * len(heading))
+            elif name in ['button']:
+                lines.append('')
+                lines.append(f'(button) {indent + get_text_with_links(node)} (button)')
+            elif name in ['p']:
+                lines.append('')
+                lines.append(indent + get_text_with_links(node).strip())
+            elif name in ['ul', 'ol']:
+                for li in node.find_all('li', recursive=False):
+                    recurse(li, indent + "  ")
+            elif name == 'li':
+                lines.append(indent + "- " + get_text_with_links(node).strip())
+            else:
+                for child in node.children:
+                    recurse(child, indent)
+
+    def get_text_with_links(tag):
+        parts = []
+        seen_strings = set()
+        for child in tag.descendants:
+            if isinstance(child, NavigableString):
+                text = child.strip()
+                if text:
+                    parent = child.find_parent('a', href=True)
+                    if parent:
+                        full_url = urljoin(SAMHSA_URL, parent['href'])
+                        combined = f"{text} ({full_url})"
+                        if combined not in seen_strings:
+                            seen_strings.add(combined)
+                            parts.append(combined)
+                    elif not parent:
+                        parts.append(text)
+                        seen_strings.add(text)
+            elif isinstance(child, Tag) and child.name == 'a' and child.get('href'):
+                anchor = child.get_text(strip=True)
+                href = child['href']
+                full_url = urljoin(SAMHSA_URL, href)
+                combined = f"{anchor} ({full_url})"
+                if combined not in seen_strings:
+                    seen_strings.add(combined)
+                    parts.append(f"{anchor} ({full_url})")
+                    if href.lower().endswith('pdf'):
+                        pdf_links.append(full_url)
+
+        return ' '.join(filter(None, parts))
+
+    recurse(element)
+    return "\n\n".join(line for line in lines if line.strip()), pdf_links
+
+def legacy_etm_format_text(element):
+    lines = []
+
+    def recurse(node, indent=""):
+        if isinstance(node, NavigableString):
+            text = node.strip()
+            if text:
+                lines.append(indent + text)
+
+        elif isinstance(node, Tag):
+            name = node.name.lower()
+
+            if name in ['script', 'style', 'nav', 'footer']:
+                return  # skip
+
+            if name.startswith('h') and name[1:].isdigit():
+                heading = get_text_with_links(node).strip()
+                lines.append('\n' + heading)
+                lines.append('-' * len(heading))
+            elif name in ['p']:
+                lines.append('')
+                lines.append(indent + get_text_with_links(node).strip())
+            elif name in ['ul', 'ol']:
+                for li in node.find_all('li', recursive=False):
+                    recurse(li, indent + "  ")
+            elif name == 'li':
+                lines.append(indent + "- " + get_text_with_links(node).strip())
+            else:
+                for child in node.children:
+                    recurse(child, indent)
+
+    def get_text_with_links(tag):
+        parts = []
+        for child in tag.descendants:
+            if isinstance(child, NavigableString):
+                parts.append(child.strip())
+            elif isinstance(child, Tag) and child.name == 'a' and child.get('href'):
+                anchor = child.get_text(strip=True)
+                href = child['href']
+                full_url = urljoin(ETM_URL, href)
+                parts.append(f"{anchor} ({full_url})")
+        return ' '.join(filter(None, parts))
+
+    recurse(element)
+    return "\n\n".join(line for line in lines if line.strip())
+
+def synthetic_page(sections, depth, seed=0):
+    rng = random.Random(seed)
+    words = "mental health substance use treatment support recovery crisis care".split()
+
+    def sentence():
+        return " ".join(rng.choice(words) for _ in range(rng.randint(4, 14)))
+
+    def link():
+        href = rng.choice(["/find-help", "/about", "/data/report.pdf", "https://example.org/x", "#top", ""])
+        return f'<a href="{href}">{sentence()}</a>'
+
+    def block(level):
+        if level == 0:
+            return f"<p>{sentence()} {link()} <strong>{sentence()}</strong></p>"
+        inner = "".join(block(level - 1) for _ in range(2))
+        kind = rng.choice(["div", "section", "ul", "article", "h3", "button", "nav"])
+        if kind == "ul":
+            items = "".join(f"<li>{sentence()} {link()}<ul><li>{sentence()}</li></ul></li>" for _ in range(3))
+            return f"<ul>{items}</ul>{inner}"
+        if kind in ("h3", "button"):
+            return f"<{kind}>{sentence()} {link()}</{kind}>{inner}"
+        return f"<{kind}>{sentence()}{inner}</{kind}>"
+
+    body = "".join(f"<h2>{sentence()}</h2>{block(depth)}" for _ in range(sections))
+    return f'<div id="main" role="main"><script>var x = 1;</script>{body}</div>'
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    html = synthetic_page(args.sections, args.depth)
+    element = BeautifulSoup(html, "html.parser").div
+    print(f"Synthetic page: {len(html):,} bytes, {len(element.find_all(True)):,} tags")
+
+    samhsa = TextFormatter(SAMHSA_URL, filter_text=SAMHSA_FILTER_TEXT, loose_text=False,
+                           buttons=True, dedupe_links=True, collect_pdfs=True)
+    etm = TextFormatter(ETM_URL)
+
+    cases = [
+        ("samhsa", lambda: legacy_samhsa_format_text(element), lambda: samhsa.format(element)),
+        ("etm", lambda: legacy_etm_format_text(element), lambda: etm.format(element)[0]),
+    ]
+    ok = True
+    for name, legacy, current in cases:
+        same = legacy() == current()
+        ok = ok and same
+        old = min(timeit.repeat(legacy, number=1, repeat=args.repeat))
+        new = min(timeit.repeat(current, number=1, repeat=args.repeat))
+        print(f"{name:>7}: legacy {old * 1000:8.1f} ms  formatter {new * 1000:8.1f} ms  "
+              f"({old / new:4.1f}x)  output {'identical' if same else 'DIFFERS'}")
+
+    # Deep nesting that the recursive version can't handle
+    deep = BeautifulSoup("<div>" * 3000 + "<p>deep</p>" + "</div>" * 3000, "html.parser").div
+    try:
+        legacy_etm_format_text(deep)
+        print("   deep: legacy ok")
+    except RecursionError:
+        print("   deep: legacy hit RecursionError")
+    print(f"   deep: formatter -> {etm.format(deep)[0]!r}")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
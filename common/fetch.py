@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import threading
+
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_PDF_BYTES = 200 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+POOL_SIZE = 16
+STATS_FILE = 'output/fetch_stats.jsonl'
+
+def _accept_encoding():
+    # urllib3 only decodes brotli when one of these is installed, so don't
+    # advertise "br" unless we can read it
+    encodings = ['gzip', 'deflate']
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+            encodings.append('br')
+            break
+        except ImportError:
+            continue
+    return ', '.join(encodings)
+
+class BodyTooLarge(Exception):
+    pass
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+totals = {'requests': 0, 'wire_bytes': 0, 'decoded_bytes': 0}
+
+def get_session():
+    # Worker threads make their first call at the same moment; the lock makes
+    # one of them build the session, and resolves the lazy requests module
+    # while held (LazyLoader isn't thread-safe before Python 3.12)
+    global _session
+    if _session is not None:
+        return _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = _accept_encoding()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+def declared_encoding(resp):
+    # Only the charset the server actually sent; requests' ISO-8859-1 default
+    # for text/* would override the page's <meta charset>
+    content_type = resp.headers.get('Content-Type', '')
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset' and value:
+            return value.strip('"\'')
+    return None
+
+def record(url, resp, decoded_bytes, truncated):
+    entry = {
+        'url': url,
+        'status': resp.status_code,
+        'content_encoding': resp.headers.get('Content-Encoding', 'identity'),
+        # urllib3's tell() counts bytes read off the socket, before decompression
+        'wire_bytes': resp.raw.tell(),
+        'decoded_bytes': decoded_bytes,
+        'truncated': truncated,
+        'fetched_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with _stats_lock:
+        totals['requests'] += 1
+        totals['wire_bytes'] += entry['wire_bytes']
+        totals['decoded_bytes'] += decoded_bytes
+        os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+        with open(STATS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+def iter_body(resp, url, max_bytes=MAX_BODY_BYTES, chunk_size=CHUNK_SIZE):
+    # Yields decoded body chunks, refusing anything over max_bytes either by
+    # Content-Length up front or by what has actually been decompressed
+    length = resp.headers.get('Content-Length')
+    if length and length.isdigit() and int(length) > max_bytes:
+        record(url, resp, 0, True)
+        raise BodyTooLarge(f"Content-Length {length} exceeds {max_bytes} bytes")
+
+    decoded = 0
+    truncated = True
+    try:
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            decoded += len(chunk)
+            if decoded > max_bytes:
+                raise BodyTooLarge(f"body exceeds {max_bytes} bytes")
+            yield chunk
+        truncated = False
+    finally:
+        record(url, resp, decoded, truncated)
+
+def fetch(url, timeout=10, max_bytes=MAX_BODY_BYTES, headers=None):
+    # Returns (status_code, body bytes, declared charset or None). Callers
+    # hand the bytes straight to the parser instead of going through resp.text.
+    with get_session().get(url, timeout=timeout, headers=headers, stream=True) as resp:
+        if resp.status_code != 200:
+            record(url, resp, 0, False)
+            return resp.status_code, b'', None
+        body = b''.join(iter_body(resp, url, max_bytes))
+        return resp.status_code, body, declared_encoding(resp)
+
+def print_totals():
+    if not totals['requests']:
+        return
+    wire, decoded = totals['wire_bytes'], totals['decoded_bytes']
+    ratio = f" ({decoded / wire:.1f}x)" if wire else ""
+    print(f"📊 {totals['requests']} requests: {wire:,} bytes on the wire, {decoded:,} decoded{ratio}")
@@ -0,0 +1,18 @@
+import sys
+import importlib.util
+
+def lazy_import(name):
+    # Returns the module without executing it; the real import happens on
+    # first attribute access. Keeps requests/bs4/boto3 off the startup path
+    # of CLI invocations that never touch them (--help, nothing to retry, ...).
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
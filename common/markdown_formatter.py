@@ -0,0 +1,51 @@
+import re
+from urllib.parse import urljoin
+
+from lazy import lazy_import
+
+markdownify = lazy_import('markdownify')
+
+_converter_class = None
+
+def converter_class():
+    # Defined on first use so importing this module doesn't pull in markdownify
+    global _converter_class
+    if _converter_class is not None:
+        return _converter_class
+
+    class PageMarkdownConverter(markdownify.MarkdownConverter):
+        # markdownify walks the tree once; we only absolutize links and drop
+        # the same chrome format_text skips. *args keeps us compatible with
+        # both the old (convert_as_inline) and new (parent_tags) signatures.
+
+        def __init__(self, base_url, **options):
+            super().__init__(**options)
+            self.base_url = base_url
+
+        def convert_a(self, el, text, *args, **kwargs):
+            if el.get('href'):
+                el['href'] = urljoin(self.base_url, el['href'])
+            return super().convert_a(el, text, *args, **kwargs)
+
+        def convert_nav(self, el, text, *args, **kwargs):
+            return ''
+
+        convert_footer = convert_nav
+
+    _converter_class = PageMarkdownConverter
+    return _converter_class
+
+class MarkdownFormatter:
+    # Converts a content element into the Markdown written next to
+    # output/text: ATX headings, "-" bullets, absolute links, no nav/footer.
+    # Build one per site and reuse it.
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.converter = None
+
+    def format(self, element):
+        if self.converter is None:
+            self.converter = converter_class()(self.base_url, heading_style='ATX', bullets='-')
+        markdown = self.converter.convert_soup(element)
+        return re.sub(r'\n{3,}', '\n\n', markdown).strip() + '\n'
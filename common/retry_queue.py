@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+
+RETRY_DIR = 'output/retry'
+RETRY_QUEUE_FILE = os.path.join(RETRY_DIR, 'retry_queue.json')
+DEAD_LETTER_FILE = os.path.join(RETRY_DIR, 'dead_letter.jsonl')
+MAX_ATTEMPTS = 5
+BASE_DELAY = 2  # seconds, doubled after every failed attempt
+MAX_DELAY = 300
+
+def is_retryable_status(status_code):
+    return status_code == 429 or status_code >= 500
+
+class RetryQueue:
+    # Failed fetches are kept on disk keyed by (kind, url), where kind is the
+    # stage that failed: "links" (crawl), "content" (extract) or "pdf".
+    # Anything that runs out of attempts, or fails in a way retrying can't
+    # fix (e.g. a 404), is appended to the dead-letter file instead.
+    # fail() and succeed() may be called from fetch worker threads.
+
+    def __init__(self, path=RETRY_QUEUE_FILE, dead_letter_path=DEAD_LETTER_FILE,
+                 max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY):
+        self.path = path
+        self.dead_letter_path = dead_letter_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.entries = {}
+        # Dead letters handed out by take_dead_letters() whose retry hasn't
+        # finished yet; they stay in the file until it has
+        self.taken = set()
+        self.lock = threading.RLock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    self.entries[(entry['kind'], entry['url'])] = entry
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entries.values()), f, indent=2)
+
+    def fail(self, kind, url, error, retryable=True, **context):
+        with self.lock:
+            key = (kind, url)
+            entry = self.entries.pop(key, None) or {
+                'kind': kind,
+                'url': url,
+                'attempts': 0,
+                'context': context,
+            }
+            entry['attempts'] += 1
+            entry['error'] = str(error)
+
+            if not retryable or entry['attempts'] >= self.max_attempts:
+                self._dead_letter(entry)
+            else:
+                delay = min(self.base_delay * 2 ** (entry['attempts'] - 1), MAX_DELAY)
+                entry['next_attempt'] = time.time() + delay
+                self.entries[key] = entry
+                print(f"🔁 Queued for retry in {delay}s (attempt {entry['attempts']}/{self.max_attempts}): {url}")
+            self.save()
+            if key in self.taken:
+                # Only now that the new failure is on disk
+                self._release(key, keep_last=key not in self.entries)
+
+    def succeed(self, kind, url):
+        with self.lock:
+            key = (kind, url)
+            if self.entries.pop(key, None) is not None:
+                print(f"✅ Recovered after retry: {url}")
+                self.save()
+            if key in self.taken:
+                print(f"✅ Recovered from dead letters: {url}")
+                self._release(key)
+
+    def pending(self, kind, **context):
+        with self.lock:
+            return sorted(
+                (e for e in self.entries.values() if e['kind'] == kind and _matches(e, context)),
+                key=lambda e: e['next_attempt'],
+            )
+
+    def drain(self, kind, handler, stop=None, **context):
+        # handler(url, context) is expected to call fail() or succeed() itself,
+        # the same way the fetch functions do on their normal path. stop(wait)
+        # is asked before each entry, with the seconds we'd sleep for it; if
+        # it returns a reason, draining ends and the rest stay queued.
+        while True:
+            pending = self.pending(kind, **context)
+            if not pending:
+                return
+            entry = pending[0]
+            wait = entry['next_attempt'] - time.time()
+            reason = stop(max(wait, 0)) if stop else None
+            if reason:
+                print(f"⏹️  Stopping retries: {reason} ({len(pending)} left queued)")
+                return
+            if wait > 0:
+                print(f"⏳ Waiting {wait:.0f}s before retrying {entry['url']}")
+                time.sleep(wait)
+            attempts = entry['attempts']
+            handler(entry['url'], entry['context'])
+            with self.lock:
+                current = self.entries.get((kind, entry['url']))
+                if current is not None and current['attempts'] == attempts:
+                    # Handler neither failed nor succeeded; don't spin on it
+                    self.entries.pop((kind, entry['url']))
+                    self.save()
+
+    def _dead_letter(self, entry):
+        entry = dict(entry)
+        entry.pop('next_attempt', None)
+        entry['failed_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"💀 Gave up after {entry['attempts']} attempt(s): {entry['url']} ({entry['error']})")
+
+    def dead_letters(self, kind, **context):
+        if not os.path.exists(self.dead_letter_path):
+            return []
+        latest = {}
+        with open(self.dead_letter_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    latest[(entry['kind'], entry['url'])] = entry
+        return [e for e in latest.values() if e['kind'] == kind and _matches(e, context)]
+
+    def take_dead_letters(self, kind, **context):
+        # Returns the matching entries for a retry. They stay in the
+        # dead-letter file until their retry calls succeed() or fail(), so an
+        # interrupted retry run loses nothing.
+        with self.lock:
+            taken = self.dead_letters(kind, **context)
+            self.taken.update((e['kind'], e['url']) for e in taken)
+            return taken
+
+    def _release(self, key, keep_last=False):
+        # Drops the key's lines from the dead-letter file, except the one
+        # fail() has just appended when keep_last is set
+        self.taken.discard(key)
+        with open(self.dead_letter_path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        drop = []
+        for i, line in enumerate(lines):
+            entry = json.loads(line)
+            if (entry['kind'], entry['url']) == key:
+                drop.append(i)
+        if keep_last:
+            drop = drop[:-1]
+        if not drop:
+            return
+        drop = set(drop)
+        with open(self.dead_letter_path + '.part', 'w', encoding='utf-8') as f:
+            f.writelines(line for i, line in enumerate(lines) if i not in drop)
+        os.replace(self.dead_letter_path + '.part', self.dead_letter_path)
+
+def _matches(entry, context):
+    return all(entry['context'].get(k) == v for k, v in context.items())
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+def get_queue():
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = RetryQueue()
+    return _default_queue
@@ -0,0 +1,176 @@
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from lazy import lazy_import
+from fetch import fetch, POOL_SIZE
+from retry_queue import get_queue, is_retryable_status
+from text_formatter import TextFormatter
+from markdown_formatter import MarkdownFormatter, converter_class
+from sitemap import parse_sitemap
+
+bs4 = lazy_import('bs4')
+requests = lazy_import('requests')
+
+BLOCKED_EXTENSIONS = ('.pdf', '.csv', '.doc', '.docx', '.zip', '.xls', '.xlsx',
+                      '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp3', '.mp4')
+
+Page = namedtuple('Page', ['url', 'html', 'text', 'pdfs', 'markdown', 'links'])
+
+class SiteAdapter:
+    # Everything the crawl/extract engine below needs to know about a site:
+    #   discover()        seed URLs (sitemap, known pages); more are found by
+    #                     following in-scope links from every fetched page
+    #   in_scope(url)     whether a normalized URL is a page of this site
+    #   select_content()  the content element, first matching selector wins
+    #   strip_tags        removed from the content before formatting
+    #   text_rules        TextFormatter options for output/text
+    base_url = None
+    sitemap_url = None
+    content_selectors = ('main', 'body')
+    strip_tags = ('script', 'style')
+    text_rules = {}
+    blocked_extensions = BLOCKED_EXTENSIONS
+
+    def __init__(self):
+        self.netloc = urlparse(self.base_url).netloc
+        self.text_formatter = TextFormatter(self.base_url, **self.text_rules)
+        self.markdown_formatter = MarkdownFormatter(self.base_url)
+
+    def discover(self):
+        seeds = [self.base_url]
+        if self.sitemap_url:
+            seeds += sitemap_urls(self.sitemap_url)
+        return [self.normalize(url) for url in seeds]
+
+    def normalize(self, url):
+        parsed = urlparse(url)
+        path = parsed.path.rstrip('/')
+        return f"{parsed.scheme}://{parsed.netloc}{path}" if path else f"{parsed.scheme}://{parsed.netloc}"
+
+    def in_scope(self, url):
+        parsed = urlparse(url)
+        return (parsed.scheme in ('http', 'https') and parsed.netloc == self.netloc
+                and not parsed.path.lower().endswith(self.blocked_extensions))
+
+    def page_links(self, soup):
+        # Taken from the whole document so navigation menus are followed too
+        links = set()
+        for a in soup.find_all('a', href=True):
+            href = a['href'].split('#')[0].strip()
+            if not href or href.startswith(('javascript:', 'mailto:', 'tel:')):
+                continue
+            url = self.normalize(urljoin(self.base_url, href))
+            if self.in_scope(url):
+                links.add(url)
+        return sorted(links)
+
+    def select_content(self, soup):
+        for selector in self.content_selectors:
+            main = soup.select_one(selector)
+            if main is not None:
+                return main
+        return soup
+
+    def format_text(self, main):
+        return self.text_formatter.format(main)
+
+    def format_markdown(self, main):
+        return self.markdown_formatter.format(main)
+
+    def parse(self, url, page_html, encoding=None):
+        soup = bs4.BeautifulSoup(page_html, 'html.parser', from_encoding=encoding)
+        links = self.page_links(soup)
+        main = self.select_content(soup)
+        for tag in main.find_all(list(self.strip_tags)):
+            tag.decompose()
+
+        html = str(main)
+        text, pdfs = self.format_text(main)
+        return Page(url, html, text, pdfs, self.format_markdown(main), links)
+
+def sitemap_urls(sitemap_url):
+    try:
+        status, body, encoding = fetch(sitemap_url, timeout=10)
+    except Exception as e:
+        print(f"Error fetching sitemap {sitemap_url}: {e}")
+        return []
+    if status != 200:
+        print(f"⚠️  No sitemap (HTTP {status}): {sitemap_url}")
+        return []
+
+    try:
+        urls, child_sitemaps = parse_sitemap(body)
+    except ET.ParseError as e:
+        print(f"Error parsing sitemap {sitemap_url}: {e}")
+        return []
+    for child in child_sitemaps:
+        urls += sitemap_urls(child)
+    return urls
+
+def extract_page(adapter, url):
+    # Failures go to the retry queue as "content" entries, so the page and
+    # the subtree only reachable through it can be crawled again later
+    try:
+        print(f"Visiting: {url}")
+        status, body, encoding = fetch(url, timeout=10)
+        if status != 200:
+            print(f"⚠️  Skipped (HTTP {status}): {url}")
+            get_queue().fail("content", url, f"HTTP {status}", retryable=is_retryable_status(status))
+            return None
+        page = adapter.parse(url, body, encoding)
+        get_queue().succeed("content", url)
+        return page
+    except Exception as e:
+        print(f"❌ Error: {e} at {url}")
+        get_queue().fail("content", url, e, retryable=isinstance(e, requests.RequestException))
+        return None
+
+def crawl_site(adapter, workers=POOL_SIZE, max_pages=None, seeds=None, known=()):
+    # One pass over the site: every page is fetched once on the shared
+    # session's connection pool, extracted, and its in-scope links queued.
+    # URLs in known were fetched earlier and are not fetched again.
+    # Yields Pages in completion order.
+    queued = set()
+    known = set(known)
+    futures = {}
+    # Resolve the lazy imports here: LazyLoader isn't thread-safe before
+    # Python 3.12 (get_session() takes care of requests itself)
+    bs4.BeautifulSoup, converter_class()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit(url):
+            if url in queued or url in known or not adapter.in_scope(url):
+                return
+            if max_pages is not None and len(queued) >= max_pages:
+                return
+            queued.add(url)
+            futures[pool.submit(extract_page, adapter, url)] = url
+
+        for url in adapter.discover() if seeds is None else seeds:
+            submit(url)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                del futures[future]
+                page = future.result()
+                if page is None:
+                    continue
+                for link in page.links:
+                    submit(link)
+                yield page
+
+def build_structure(urls):
+    # Nests each URL under the longest other URL whose path prefixes it,
+    # the same {url: {child_url: {...}}} shape the structure JSON uses
+    tree = {}
+    by_path = {}
+    for url in sorted(urls, key=lambda u: (urlparse(u).path.count('/'), u)):
+        prefix = urlparse(url).path
+        parent = None
+        while parent is None and '/' in prefix.strip('/'):
+            prefix = prefix.rsplit('/', 1)[0]
+            parent = by_path.get(prefix)
+        node = by_path[urlparse(url).path] = {}
+        (parent if parent is not None else tree)[url] = node
+    return tree
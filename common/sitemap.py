@@ -0,0 +1,14 @@
+import xml.etree.ElementTree as ET
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+def parse_sitemap(body):
+    # Returns (page URLs, child sitemap URLs) from a sitemap or sitemap index.
+    # Parsed as XML so entities like &amp; in <loc> are decoded; image and
+    # video <loc>s live in other namespaces and are ignored.
+    root = ET.fromstring(body)
+    locs = [el.text.strip() for el in root.iter()
+            if el.tag in (SITEMAP_NS + 'loc', 'loc') and el.text and el.text.strip()]
+    if root.tag.endswith('sitemapindex'):
+        return [], locs
+    return locs, []
@@ -0,0 +1,165 @@
+from functools import lru_cache
+from urllib.parse import urljoin
+
+from lazy import lazy_import
+
+bs4 = lazy_import('bs4')
+
+SKIP_TAGS = frozenset({'script', 'style', 'nav', 'footer'})
+LIST_TAGS = frozenset({'ul', 'ol'})
+
+# Sentinel for tags whose subtree is dropped entirely
+_SKIP = object()
+
+@lru_cache(maxsize=4096)
+def absolute_url(base_url, href):
+    return urljoin(base_url, href)
+
+class TextFormatter:
+    # Flattens a content element into the plain-text layout written to
+    # output/text: underlined headings, "- " list items indented per level,
+    # paragraphs, and "anchor (url)" links. Build one per site and reuse it;
+    # the tag -> handler table is computed once per tag name and the tree is
+    # walked with an explicit stack, so deep DOMs can't hit the recursion limit.
+    #
+    # Per-site rules:
+    #   filter_text   loose strings to drop (compared lowercased)
+    #   loose_text    emit strings that aren't inside a p/li/heading/button
+    #   buttons       render <button> as "(button) ... (button)"
+    #   dedupe_links  collapse repeated "text (url)" parts within a block and
+    #                 tag text nested in a link with that link's URL
+    #   collect_pdfs  return hrefs ending in "pdf" alongside the text
+
+    def __init__(self, base_url, filter_text=(), loose_text=True, buttons=False,
+                 dedupe_links=False, collect_pdfs=False, skip_tags=SKIP_TAGS):
+        self.base_url = base_url
+        self.filter_text = frozenset(t.lower() for t in filter_text)
+        self.loose_text = loose_text
+        self.dedupe_links = dedupe_links
+        self.collect_pdfs = collect_pdfs
+
+        self.dispatch = {name: _SKIP for name in skip_tags}
+        self.dispatch.update({name: self._list for name in LIST_TAGS})
+        self.dispatch['p'] = self._paragraph
+        self.dispatch['li'] = self._item
+        if buttons:
+            self.dispatch['button'] = self._button
+
+    def handler_for(self, name):
+        try:
+            return self.dispatch[name]
+        except KeyError:
+            pass
+        lowered = name.lower()
+        if lowered in self.dispatch:
+            handler = self.dispatch[lowered]
+        elif lowered.startswith('h') and lowered[1:].isdigit():
+            handler = self._heading
+        else:
+            handler = None
+        self.dispatch[name] = handler
+        return handler
+
+    def format(self, element):
+        NavigableString, Tag = bs4.NavigableString, bs4.Tag
+        lines = []
+        pdf_links = []
+        stack = [(element, '')]
+
+        while stack:
+            node, indent = stack.pop()
+            if isinstance(node, NavigableString):
+                if self.loose_text:
+                    text = node.strip()
+                    if text and text.lower() not in self.filter_text:
+                        lines.append(indent + text)
+                continue
+            if not isinstance(node, Tag):
+                continue
+
+            handler = self.handler_for(node.name)
+            if handler is _SKIP:
+                continue
+            if handler is None:
+                stack.extend((child, indent) for child in reversed(node.contents))
+            else:
+                handler(node, indent, lines, pdf_links, stack)
+
+        return "\n\n".join(line for line in lines if line.strip()), pdf_links
+
+    def _heading(self, node, indent, lines, pdf_links, stack):
+        heading = self.inline_text(node, pdf_links).strip()
+        lines.append('\n' + heading)
+        lines.append('-' * len(heading))
+
+    def _paragraph(self, node, indent, lines, pdf_links, stack):
+        lines.append(indent + self.inline_text(node, pdf_links).strip())
+
+    def _button(self, node, indent, lines, pdf_links, stack):
+        lines.append(f'(button) {indent + self.inline_text(node, pdf_links)} (button)')
+
+    def _item(self, node, indent, lines, pdf_links, stack):
+        lines.append(indent + "- " + self.inline_text(node, pdf_links).strip())
+
+    def _list(self, node, indent, lines, pdf_links, stack):
+        items = node.find_all('li', recursive=False)
+        stack.extend((li, indent + "  ") for li in reversed(items))
+
+    def inline_text(self, tag, pdf_links):
+        if self.dedupe_links:
+            return self._inline_deduped(tag, pdf_links)
+
+        parts = []
+        for child in tag.descendants:
+            if isinstance(child, bs4.NavigableString):
+                parts.append(child.strip())
+            elif child.name == 'a' and child.get('href'):
+                href = child['href']
+                full_url = absolute_url(self.base_url, href)
+                parts.append(f"{child.get_text(strip=True)} ({full_url})")
+                if self.collect_pdfs and href.lower().endswith('pdf'):
+                    pdf_links.append(full_url)
+        return ' '.join(filter(None, parts))
+
+    def _inline_deduped(self, tag, pdf_links):
+        # Walk the subtree carrying the nearest enclosing <a href> instead of
+        # calling find_parent() for every string
+        NavigableString, Tag = bs4.NavigableString, bs4.Tag
+        parts = []
+        seen = set()
+        link = tag if tag.name == 'a' and tag.has_attr('href') else tag.find_parent('a', href=True)
+        stack = [(child, link) for child in reversed(tag.contents)]
+
+        while stack:
+            node, link = stack.pop()
+            if isinstance(node, NavigableString):
+                text = node.strip()
+                if not text:
+                    continue
+                if link is not None:
+                    combined = f"{text} ({absolute_url(self.base_url, link['href'])})"
+                    if combined not in seen:
+                        seen.add(combined)
+                        parts.append(combined)
+                else:
+                    parts.append(text)
+                    seen.add(text)
+                continue
+            if not isinstance(node, Tag):
+                continue
+
+            if node.name == 'a':
+                href = node.get('href')
+                if href:
+                    full_url = absolute_url(self.base_url, href)
+                    combined = f"{node.get_text(strip=True)} ({full_url})"
+                    if combined not in seen:
+                        seen.add(combined)
+                        parts.append(combined)
+                        if self.collect_pdfs and href.lower().endswith('pdf'):
+                            pdf_links.append(full_url)
+                if href is not None:
+                    link = node
+            stack.extend((child, link) for child in reversed(node.contents))
+
+        return ' '.join(filter(None, parts))
@@ -0,0 +1,25 @@
+import os
+import sys
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from site_adapter import SiteAdapter
+
+BASE_URL = "https://www.equaltreatmentmd.org"
+
+# Squarespace endpoints that are links on every page but not content
+SKIP_SECTIONS = frozenset({'cart', 'account', 'commerce', 'search', 's', 'static', 'api', 'config'})
+
+class EqualTreatmentAdapter(SiteAdapter):
+    # equaltreatmentmd.org is a Squarespace site: pages are listed in
+    # /sitemap.xml and linked from the header navigation. The content lives
+    # in the main-content <main>; the #siteWrapper and <body> fallbacks cover
+    # page templates without one, minus the site header.
+    base_url = BASE_URL
+    sitemap_url = f"{BASE_URL}/sitemap.xml"
+    content_selectors = ('main[data-content-field="main-content"]', 'main', 'div#siteWrapper', 'body')
+    strip_tags = ('script', 'style', 'header')
+
+    def in_scope(self, url):
+        section = urlparse(url).path.strip('/').split('/')[0]
+        return super().in_scope(url) and section not in SKIP_SECTIONS
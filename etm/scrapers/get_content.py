@@ -1,13 +1,24 @@
 import os
+import sys
 import json
-import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
-from urllib.parse import urlparse, urljoin
+import argparse
+from urllib.parse import urlparse
 
-BASE_URL = "https://www.equaltreatmentmd.org"
-CONTENT_SELECTOR = 'main[data-content-field="main-content"]'
+from adapter import BASE_URL, EqualTreatmentAdapter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from site_adapter import crawl_site, extract_page, build_structure
+from fetch import print_totals, POOL_SIZE
+from retry_queue import get_queue
+
+STRUCTURE_FILE = 'output/structure/equaltreatment_structure.json'
 HTML_DIR = 'output/html'
 TEXT_DIR = 'output/text'
+# Pages whose extracted text is shorter than this are re-fetched through the
+# headless render pool (only when --render is passed)
+RENDER_THRESHOLD = 200
+
+ADAPTER = EqualTreatmentAdapter()
 
 def sanitize_path(url):
     path = urlparse(url).path.strip('/')
@@ -33,107 +44,130 @@ def save_text(url, text):
         f.write(text)
     print(f"📄 Saved Text: {out_path}")
 
-# def extract_main_content(url):
-#     try:
-#         print(f"Visiting: {url}")
-#         resp = requests.get(url, timeout=10)
-#         if resp.status_code != 200:
-#             print(f"⚠️ Skipped (HTTP {resp.status_code}): {url}")
-#             return None, None
-#         soup = BeautifulSoup(resp.text, 'html.parser')
-#         main = soup.select_one(CONTENT_SELECTOR)
-#         if not main:
-#             print(f"⚠️ No main content for: {url}")
-#             return None, None
-#         return str(main), format_text(main)
-#     except Exception as e:
-#         print(f"❌ Error: {e} at {url}")
-#         return None, None
+def save_markdown(url, markdown):
+    rel_path = sanitize_path(url)
+    parts = rel_path.split('/')
+    folder_path = os.path.join(TEXT_DIR, *parts)
+    os.makedirs(folder_path, exist_ok=True)
+    out_path = os.path.join(folder_path, f"{parts[-1] or 'index'}.md")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(markdown)
+    print(f"📑 Saved Markdown: {out_path}")
 
 def extract_main_content(url):
-    try:
-        print(f"Visiting: {url}")
-        resp = requests.get(url, timeout=10)
-        if resp.status_code != 200:
-            print(f"⚠️  Skipped (HTTP {resp.status_code}): {url}")
-            return None, None
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        main = soup.select_one("main") or soup.select_one("div.site-wrapper") or soup.body
-
-        # Remove script and style tags
-        for tag in main.find_all(['script', 'style']):
-            tag.decompose()
-
-        # Use format_text for structured, deduplicated output
-        return str(main), format_text(main)
-
-    except Exception as e:
-        print(f"❌ Error: {e} at {url}")
-        return None, None
-
-def format_text(element):
-    lines = []
-
-    def recurse(node, indent=""):
-        if isinstance(node, NavigableString):
-            text = node.strip()
-            if text:
-                lines.append(indent + text)
-
-        elif isinstance(node, Tag):
-            name = node.name.lower()
-
-            if name in ['script', 'style', 'nav', 'footer']:
-                return  # skip
-
-            if name.startswith('h') and name[1:].isdigit():
-                heading = get_text_with_links(node).strip()
-                lines.append('\n' + heading)
-                lines.append('-' * len(heading))
-            elif name in ['p']:
-                lines.append('')
-                lines.append(indent + get_text_with_links(node).strip())
-            elif name in ['ul', 'ol']:
-                for li in node.find_all('li', recursive=False):
-                    recurse(li, indent + "  ")
-            elif name == 'li':
-                lines.append(indent + "- " + get_text_with_links(node).strip())
-            else:
-                for child in node.children:
-                    recurse(child, indent)
-
-    def get_text_with_links(tag):
-        parts = []
-        for child in tag.descendants:
-            if isinstance(child, NavigableString):
-                parts.append(child.strip())
-            elif isinstance(child, Tag) and child.name == 'a' and child.get('href'):
-                anchor = child.get_text(strip=True)
-                href = child['href']
-                full_url = urljoin(BASE_URL, href)
-                parts.append(f"{anchor} ({full_url})")
-        return ' '.join(filter(None, parts))
-
-    recurse(element)
-    return "\n\n".join(line for line in lines if line.strip())
-
-
-def process_structure(structure):
+    page = extract_page(ADAPTER, url)
+    if page is None:
+        return None, None, None
+    return page.html, page.text, page.markdown
+
+def parse_main_content(page_html, encoding=None, url=BASE_URL):
+    page = ADAPTER.parse(url, page_html, encoding)
+    return page.html, page.text, page.markdown
+
+def needs_render(text):
+    return len((text or '').strip()) < RENDER_THRESHOLD
+
+def save_page(page):
+    if page.html:
+        save_html(page.url, page.html)
+    if page.text:
+        save_text(page.url, page.text)
+    if page.markdown:
+        save_markdown(page.url, page.markdown)
+
+def process_site(workers, max_pages=None, thin_pages=None, seeds=None, known=()):
+    # Discovers, fetches and extracts every page in one pass (with seeds,
+    # everything reachable from them that isn't in known), then retries the
+    # pages that failed and crawls on from the ones that come back. Returns
+    # the URLs of the pages it extracted.
+    urls = []
+
+    def save_pages(pages):
+        for page in pages:
+            urls.append(page.url)
+            if thin_pages is not None and needs_render(page.text):
+                print(f"🪶 Thin page ({len((page.text or '').strip())} chars), queued for render: {page.url}")
+                thin_pages.append(page.url)
+            save_page(page)
+
+    def retry(url, context):
+        remaining = None if max_pages is None else max_pages - len(urls)
+        save_pages(crawl_site(ADAPTER, workers, remaining, [url], set(known) | set(urls)))
+
+    def page_limit_reached(wait):
+        if max_pages is not None and len(urls) >= max_pages:
+            return f"page limit of {max_pages} reached"
+        return None
+
+    save_pages(crawl_site(ADAPTER, workers, max_pages, seeds, known))
+    get_queue().drain("content", retry, stop=page_limit_reached)
+    return urls
+
+def structure_urls(structure):
+    urls = []
     for url, children in structure.items():
-        html, text = extract_main_content(url)
-        if html:
-            save_html(url, html)
-        if text:
-            save_text(url, text)
+        urls.append(url)
         if isinstance(children, dict):
-            process_structure(children)
+            urls.extend(structure_urls(children))
+    return urls
 
-def main():
-    with open("output/structure/equaltreatment_structure.json", "r", encoding="utf-8") as f:
-        structure = json.load(f)
+def load_structure_urls():
+    if not os.path.exists(STRUCTURE_FILE):
+        return []
+    with open(STRUCTURE_FILE, "r", encoding="utf-8") as f:
+        return structure_urls(json.load(f))
+
+def render_thin_pages(urls, workers):
+    from render import RenderPool, playwright_available
+
+    if not urls:
+        return
+    if not playwright_available():
+        print(f"⚠️  playwright is not installed, leaving {len(urls)} thin pages as fetched")
+        return
 
-    process_structure(structure)
+    with RenderPool(workers=workers) as pool:
+        rendered = pool.render_all(urls)
+
+    for url, page_html in rendered.items():
+        if page_html is None:
+            continue
+        save_page(ADAPTER.parse(url, page_html))
+
+def main():
+    global RENDER_THRESHOLD
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--render", action="store_true",
+                        help="re-fetch thin pages through a headless browser pool")
+    parser.add_argument("--render-threshold", type=int, default=RENDER_THRESHOLD)
+    parser.add_argument("--render-workers", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=POOL_SIZE, help="concurrent page fetches")
+    parser.add_argument("--max-pages", type=int, help="stop discovering after this many pages")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="only re-crawl pages from the dead-letter file and merge them into the saved structure")
+    args = parser.parse_args()
+
+    RENDER_THRESHOLD = args.render_threshold
+    thin_pages = [] if args.render else None
+    if args.retry_failed:
+        known = load_structure_urls()
+        dead = get_queue().take_dead_letters("content")
+        print(f"Retrying {len(dead)} dead-lettered pages...")
+        urls = process_site(args.workers, args.max_pages, thin_pages,
+                            [entry["url"] for entry in dead], known)
+        structure = build_structure(set(known) | set(urls))
+    else:
+        structure = build_structure(process_site(args.workers, args.max_pages, thin_pages))
+
+    os.makedirs(os.path.dirname(STRUCTURE_FILE), exist_ok=True)
+    with open(STRUCTURE_FILE, "w", encoding="utf-8") as f:
+        json.dump(structure, f, indent=2)
+    print(f"✅ Structure saved to {STRUCTURE_FILE}")
+
+    if thin_pages:
+        render_thin_pages(thin_pages, args.render_workers)
+    print_totals()
 
 if __name__ == "__main__":
     main()
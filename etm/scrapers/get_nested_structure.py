@@ -1,24 +1,20 @@
 # get_nested_structure_eqtmd.py
-import json, os
-from urllib.parse import urlparse
-from collections import OrderedDict
+# Structure only: discovers pages from the sitemap and navigation links
+# without writing any content. get_content.py does this and the extraction
+# in the same pass.
+import os
+import sys
+import json
+import argparse
 
-BASE_URL = "https://www.equaltreatmentmd.org"
-PAGES = [
-    "/about-the-coalition",
-    "/newsletter",
-    "/contact-us",
-    "/platform",
-    "/maryland-resources",
-    "/maryland-voices"
-]
+from adapter import EqualTreatmentAdapter
 
-def build_structure():
-    tree = OrderedDict()
-    for page in PAGES:
-        full_url = f"{BASE_URL}{page}"
-        tree[full_url] = {}
-    return tree
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from site_adapter import crawl_site, build_structure
+from fetch import print_totals, POOL_SIZE
+
+def discover_structure(workers=POOL_SIZE, max_pages=None):
+    return build_structure(page.url for page in crawl_site(EqualTreatmentAdapter(), workers, max_pages))
 
 def save_to_json(data, filename):
     os.makedirs("./output/structure", exist_ok=True)
@@ -27,8 +23,14 @@ def save_to_json(data, filename):
     print(f"✅ Structure saved to output/structure/{filename}")
 
 def main():
-    structure = build_structure()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--max-pages", type=int)
+    args = parser.parse_args()
+
+    structure = discover_structure(args.workers, args.max_pages)
     save_to_json(structure, "equaltreatment_structure.json")
+    print_totals()
 
 if __name__ == "__main__":
     main()
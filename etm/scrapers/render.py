@@ -0,0 +1,146 @@
+import os
+import sys
+import queue
+import threading
+from concurrent.futures import Future
+
+RENDER_WORKERS = 2
+RENDER_TIMEOUT_MS = 20000
+RENDER_WAIT_UNTIL = "networkidle"
+
+def playwright_available():
+    try:
+        import playwright.sync_api  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class RenderPool:
+    # Each worker thread owns one headless browser and one page, and reuses
+    # them for every job it pulls off the queue. Playwright's sync API is
+    # bound to the thread that started it, so browsers are never shared.
+
+    def __init__(self, workers=RENDER_WORKERS, timeout_ms=RENDER_TIMEOUT_MS):
+        self.timeout_ms = timeout_ms
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.live = workers
+        self.threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"render-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def _worker(self):
+        try:
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                try:
+                    self._serve(browser)
+                finally:
+                    browser.close()
+        except Exception as e:
+            # Usually the browser was never installed (playwright install chromium)
+            print(f"❌ Render worker stopped: {e}")
+        finally:
+            self._retire()
+
+    def _serve(self, browser):
+        page = browser.new_page()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            url, future = job
+            try:
+                print(f"🖥️  Rendering: {url}")
+                page.goto(url, wait_until=RENDER_WAIT_UNTIL, timeout=self.timeout_ms)
+                future.set_result(page.content())
+            except Exception as e:
+                print(f"❌ Render error: {e} at {url}")
+                future.set_result(None)
+                # A crashed page can't be reused, start a fresh one
+                try:
+                    page.close()
+                except Exception:
+                    pass
+                page = browser.new_page()
+
+    def _retire(self):
+        # When the last worker is gone nobody will pick up queued jobs, so
+        # resolve them as failed renders instead of leaving callers blocked
+        with self.lock:
+            self.live -= 1
+            if self.live:
+                return
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                job[1].set_result(None)
+
+    def render(self, url):
+        future = Future()
+        with self.lock:
+            if not self.live:
+                future.set_result(None)
+                return future
+            self.jobs.put((url, future))
+        return future
+
+    def render_all(self, urls):
+        futures = {url: self.render(url) for url in urls}
+        return {url: f.result() for url, f in futures.items()}
+
+    def close(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for t in self.threads:
+            t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def to_url(target):
+    if "://" in target:
+        return target
+    return "file://" + os.path.abspath(target)
+
+def main():
+    # Render a page (or a local fixture file) and show what the extractor
+    # gets from the raw HTML versus the rendered DOM, e.g.
+    #   python scrapers/render.py scrapers/fixtures/render_fixture.html
+    from get_content import parse_main_content
+
+    if len(sys.argv) < 2:
+        print("Usage: python scrapers/render.py <url-or-file> [...]")
+        return
+    if not playwright_available():
+        print("⚠️  playwright is not installed (pip install playwright && playwright install chromium)")
+        return
+
+    urls = [to_url(t) for t in sys.argv[1:]]
+    with RenderPool(workers=min(RENDER_WORKERS, len(urls))) as pool:
+        rendered = pool.render_all(urls)
+
+    for target, url in zip(sys.argv[1:], urls):
+        if os.path.isfile(target):
+            with open(target, "r", encoding="utf-8") as f:
+                _, raw_text, _ = parse_main_content(f.read())
+            print(f"📄 {url}: {len(raw_text or '')} chars of text before render")
+        html = rendered[url]
+        if html is None:
+            continue
+        _, text, _ = parse_main_content(html)
+        print(f"✅ {url}: {len(text or '')} chars of text after render")
+        print(text)
+
+if __name__ == "__main__":
+    main()
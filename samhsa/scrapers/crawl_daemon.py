@@ -0,0 +1,308 @@
+# Long-lived crawl service. Keeps the scraper modules imported, the pooled
+# HTTP session warm and structure JSON parsed between jobs, and streams each
+# job's progress back as NDJSON.
+#
+#   python scrapers/crawl_daemon.py serve [--port 8642]
+#   python scrapers/crawl_daemon.py submit refresh --section find-help
+#   python scrapers/crawl_daemon.py submit extract --url https://www.samhsa.gov/find-help/988
+#
+# Jobs run one at a time, in submission order, on a single worker thread, so
+# the retry queue and raw archive are never written from two jobs at once.
+import os
+import sys
+import json
+import time
+import inspect
+import argparse
+import threading
+import itertools
+from collections import deque
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from frontier import CrawlBudget
+
+HOST = "127.0.0.1"
+PORT = 8642
+JOB_TYPES = ["crawl", "refresh", "extract", "reprocess"]
+# Per-job log lines kept for streaming; a follower that falls further behind
+# than this is told how many lines it missed
+MAX_JOB_LINES = 2000
+# Finished jobs kept for /jobs and late /events requests, oldest dropped first
+MAX_FINISHED_JOBS = 20
+
+class Job:
+    def __init__(self, job_id, job_type, params):
+        self.id = job_id
+        self.type = job_type
+        self.params = params
+        self.state = "queued"
+        self.lines = deque(maxlen=MAX_JOB_LINES)
+        self.logged = 0
+        self.changed = threading.Condition()
+
+    def log(self, line):
+        with self.changed:
+            self.lines.append(line)
+            self.logged += 1
+            self.changed.notify_all()
+
+    def finished(self):
+        return self.state not in ("queued", "running")
+
+    def finish(self, state):
+        with self.changed:
+            self.state = state
+            self.changed.notify_all()
+
+    def follow(self):
+        # Yields log lines as they arrive until the job is finished
+        sent = 0
+        while True:
+            with self.changed:
+                while sent == self.logged and not self.finished():
+                    self.changed.wait(timeout=15)
+                first = self.logged - len(self.lines)
+                skipped = max(first - sent, 0)
+                new = list(itertools.islice(self.lines, max(sent - first, 0), None))
+                sent = self.logged
+                finished = self.finished()
+            if skipped:
+                yield {"job": self.id, "line": f"... {skipped} earlier lines dropped"}
+            for line in new:
+                yield {"job": self.id, "line": line}
+            if finished:
+                yield {"job": self.id, "state": self.state}
+                return
+
+    def summary(self):
+        return {"id": self.id, "type": self.type, "params": self.params, "state": self.state}
+
+class JobOutput:
+    # Stands in for sys.stdout: print() from a job's thread goes to that job,
+    # anything else to the real stdout
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.buffer = threading.local()
+
+    def write(self, text):
+        job = getattr(self.local, "job", None)
+        if job is None:
+            return self.stream.write(text)
+        pending = getattr(self.buffer, "text", "") + text
+        *lines, self.buffer.text = pending.split("\n")
+        for line in lines:
+            job.log(line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+class CrawlService:
+    def __init__(self):
+        # Imported once here and reused by every job
+        import get_structure2
+        import get_content
+        import reprocess
+        self.crawler = get_structure2
+        self.extractor = get_content
+        self.reprocessor = reprocess
+
+        self.jobs = {}
+        self.jobs_lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl-job")
+        self.structures = {}
+        self.output = JobOutput(sys.stdout)
+        sys.stdout = self.output
+
+    def submit(self, job_type, params):
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        try:
+            inspect.signature(getattr(self, f"run_{job_type}")).bind(**params)
+        except TypeError as e:
+            raise ValueError(f"Bad parameters for {job_type}: {e}")
+        job = Job(next(self.ids), job_type, params)
+        with self.jobs_lock:
+            self.jobs[job.id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def get_job(self, job_id):
+        with self.jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.jobs_lock:
+            return list(self.jobs.values())
+
+    def evict_finished(self):
+        # Followers already streaming an evicted job keep their reference
+        with self.jobs_lock:
+            finished = [job.id for job in self.jobs.values() if job.finished()]
+            for job_id in finished[:-MAX_FINISHED_JOBS]:
+                del self.jobs[job_id]
+
+    def _run(self, job):
+        self.output.local.job = job
+        self.output.buffer.text = ""
+        job.state = "running"
+        started = time.monotonic()
+        try:
+            getattr(self, f"run_{job.type}")(**job.params)
+            print(f"Finished in {time.monotonic() - started:.1f}s")
+            state = "done"
+        except Exception as e:
+            print(f"❌ Job failed: {e}")
+            state = "failed"
+        finally:
+            if self.output.buffer.text:
+                job.log(self.output.buffer.text)
+            self.output.local.job = None
+        job.finish(state)
+        self.evict_finished()
+
+    def load_structure(self, section):
+        # Parsed structure JSON, reloaded only when the file changes
+        path = os.path.join("output", f"structure/{section}_structure.json")
+        mtime = os.path.getmtime(path)
+        cached = self.structures.get(section)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = (mtime, json.load(f))
+            self.structures[section] = cached
+        return cached[1]
+
+    def run_crawl(self, section, frontier="bfs", max_depth=None, max_pages=None, time_budget=None, sitemap=False):
+        budget = CrawlBudget(max_depth, max_pages, time_budget)
+        self.crawler.crawl_section(section, frontier, budget, sitemap)
+
+    def run_refresh(self, section, frontier="bfs", max_depth=None, max_pages=None, time_budget=None, sitemap=False):
+        self.run_crawl(section, frontier, max_depth, max_pages, time_budget, sitemap)
+        self.extractor.process_structure(self.load_structure(section))
+        self.extractor.retry_pending()
+
+    def run_extract(self, urls):
+        for url in urls:
+            self.extractor.process_page(url)
+
+    def run_reprocess(self, workers=None, everything=False):
+        self.reprocessor.reprocess(workers, everything)
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if parts == ["health"]:
+                return self.send_json(200, {"ok": True, "jobs": len(service.list_jobs())})
+            if parts == ["jobs"]:
+                return self.send_json(200, [job.summary() for job in service.list_jobs()])
+            if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events" and parts[1].isdigit():
+                job = service.get_job(int(parts[1]))
+                if job is None:
+                    return self.send_json(404, {"error": "no such job"})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for event in job.follow():
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                return
+            self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self.send_json(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("Request body must be a JSON object")
+                job_type = request.pop("type")
+                job = service.submit(job_type, request)
+            except (ValueError, KeyError) as e:
+                return self.send_json(400, {"error": str(e)})
+            self.send_json(202, {**job.summary(), "events": f"/jobs/{job.id}/events"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def serve(host, port):
+    service = CrawlService()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"🛰️  Crawl daemon listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def submit(host, port, job):
+    # Client side: stdlib only, so it starts instantly
+    base = f"http://{host}:{port}"
+    request = urllib.request.Request(f"{base}/jobs", data=json.dumps(job).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request) as resp:
+        created = json.load(resp)
+    print(f"Submitted job {created['id']} ({created['type']})")
+    with urllib.request.urlopen(base + created["events"]) as resp:
+        for raw in resp:
+            event = json.loads(raw)
+            if "line" in event:
+                print(event["line"])
+            else:
+                print(f"Job {event['job']} {event['state']}")
+                return event["state"] == "done"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve")
+
+    job = sub.add_parser("submit")
+    job.add_argument("type", choices=JOB_TYPES)
+    job.add_argument("--section")
+    job.add_argument("--url", action="append", dest="urls")
+    job.add_argument("--frontier")
+    job.add_argument("--max-depth", type=int)
+    job.add_argument("--max-pages", type=int)
+    job.add_argument("--time-budget", type=float)
+    job.add_argument("--sitemap", action="store_true")
+    job.add_argument("--all", action="store_true", dest="everything")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.host, args.port)
+        return
+
+    params = {"type": args.type}
+    for key in ["section", "urls", "frontier", "max_depth", "max_pages", "time_budget"]:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    if args.type == "reprocess" and args.everything:
+        params["everything"] = True
+    if args.sitemap:
+        params["sitemap"] = True
+    sys.exit(0 if submit(args.host, args.port, params) else 1)
+
+if __name__ == "__main__":
+    main()
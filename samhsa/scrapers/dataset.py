@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from lazy import lazy_import
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+pc = lazy_import('pyarrow.compute')
+
+DATASET_DIR = 'output/dataset'
+BATCH_SIZE = 500
+
+def page_schema():
+    return pa.schema([
+        ('url', pa.string()),
+        ('section', pa.string()),
+        ('parent_url', pa.string()),
+        ('depth', pa.int16()),
+        ('title', pa.string()),
+        ('headings', pa.list_(pa.struct([('level', pa.int8()), ('text', pa.string())]))),
+        ('outbound_links', pa.list_(pa.string())),
+        ('pdf_links', pa.list_(pa.string())),
+        ('word_count', pa.int32()),
+        ('extracted_at', pa.timestamp('s')),
+    ])
+
+def link_schema():
+    return pa.schema([
+        ('source_url', pa.string()),
+        ('target_url', pa.string()),
+        ('anchor', pa.string()),
+        ('internal', pa.bool_()),
+        ('pdf', pa.bool_()),
+    ])
+
+class DatasetWriter:
+    # One row per page and one row per outbound link, buffered in memory and
+    # written as a Parquet row group every batch_size pages:
+    #   output/dataset/pages.parquet, output/dataset/links.parquet
+    # Rows go to .part files that only replace the previous dataset when the
+    # run completes. With merge, rows of the previous dataset for pages this
+    # run didn't write are carried over.
+
+    def __init__(self, out_dir=DATASET_DIR, batch_size=BATCH_SIZE, site_netloc=None, merge=False):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+        self.site_netloc = site_netloc
+        self.merge = merge
+        self.page_rows = []
+        self.link_rows = []
+        self.pages_written = 0
+        self.urls_written = set()
+        self.pages = pq.ParquetWriter(self.path('pages') + '.part', page_schema(), compression='zstd')
+        self.links = pq.ParquetWriter(self.path('links') + '.part', link_schema(), compression='zstd')
+
+    def path(self, table):
+        return os.path.join(self.out_dir, f'{table}.parquet')
+
+    def add_page(self, url, text, pdfs, record, section=None, parent_url=None, depth=None):
+        headings = record.get('headings', [])
+        links = record.get('links', [])
+        self.page_rows.append({
+            'url': url,
+            'section': section,
+            'parent_url': parent_url,
+            'depth': depth,
+            'title': next((heading for level, heading in headings if level == 1), None),
+            'headings': [{'level': level, 'text': heading} for level, heading in headings],
+            'outbound_links': list(dict.fromkeys(target for target, _ in links)),
+            'pdf_links': list(dict.fromkeys(pdfs or [])),
+            'word_count': len(text.split()) if text else 0,
+            'extracted_at': int(time.time()),
+        })
+        for target, anchor in links:
+            self.link_rows.append({
+                'source_url': url,
+                'target_url': target,
+                'anchor': anchor,
+                'internal': urlparse(target).netloc == (self.site_netloc or urlparse(url).netloc),
+                'pdf': urlparse(target).path.lower().endswith('.pdf'),
+            })
+        if len(self.page_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.page_rows:
+            self.pages.write_table(pa.Table.from_pylist(self.page_rows, schema=page_schema()))
+            self.pages_written += len(self.page_rows)
+            self.urls_written.update(row['url'] for row in self.page_rows)
+            self.page_rows = []
+        if self.link_rows:
+            self.links.write_table(pa.Table.from_pylist(self.link_rows, schema=link_schema()))
+            self.link_rows = []
+
+    def carry_over(self, table, writer, url_column):
+        # Copies the previous dataset's rows for pages not written this run
+        if not os.path.exists(self.path(table)):
+            return
+        written = pa.array(sorted(self.urls_written), pa.string())
+        source = pq.ParquetFile(self.path(table))
+        for i in range(source.num_row_groups):
+            group = source.read_row_group(i)
+            keep = pc.invert(pc.is_in(group[url_column], value_set=written))
+            writer.write_table(group.filter(keep).cast(writer.schema))
+
+    def close(self, replace=True):
+        # Always finishes the .part files (so they have a footer); only a
+        # completed run swaps them in
+        self.flush()
+        if replace and self.merge:
+            self.carry_over('pages', self.pages, 'url')
+            self.carry_over('links', self.links, 'source_url')
+        self.pages.close()
+        self.links.close()
+        if not replace:
+            print(f"⚠️  Run did not complete, kept the previous dataset in {self.out_dir}")
+            return
+        for table in ('pages', 'links'):
+            os.replace(self.path(table) + '.part', self.path(table))
+        print(f"🧮 Wrote {self.pages_written} page rows to {self.out_dir}")
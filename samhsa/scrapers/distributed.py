@@ -0,0 +1,168 @@
+# Multi-node crawl + extract over a shared SQLite work queue.
+#
+#   coordinator:  python scrapers/distributed.py coordinator --db /shared/crawl.db --section find-help
+#   each node:    python scrapers/distributed.py worker --db /shared/crawl.db
+#
+# The coordinator seeds the section page, waits for the workers to drain
+# the queue, then writes output/structure/<section>_structure.json and the
+# output/html + output/text tree and the raw archive from every worker's
+# results. Workers only need the database; they don't write to output/
+# themselves.
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+from urllib.parse import urlparse
+
+from work_queue import WorkQueue, LEASE_SECONDS
+from get_structure2 import BASE_URL, fetch_nested_links, build_tree_from_links, save_to_json
+from get_content import EXTRACTOR_VERSION, parse_main_content, save_html, save_text, save_markdown
+from raw_archive import get_archive
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from retry_queue import is_retryable_status
+from fetch import fetch, print_totals
+from lazy import lazy_import
+
+requests = lazy_import('requests')
+
+POLL_SECONDS = 2
+
+def run_coordinator(db_path, section, max_depth=None, extract=True):
+    queue = WorkQueue(db_path)
+    root_url = f"{BASE_URL}/{section}"
+    root_path = urlparse(root_url).path
+
+    if queue.get_meta("state") is None:
+        queue.set_meta(section=section, root_url=root_url, root_path=root_path,
+                       max_depth=max_depth, extract=extract, state="running")
+        queue.add("links", [root_url], 0)
+        print(f"Seeded {root_url} in {db_path}")
+    else:
+        # Restarting the coordinator picks up where the queue left off
+        print(f"Resuming {queue.get_meta('section')} crawl in {db_path}")
+
+    while queue.unfinished():
+        counts = queue.counts()
+        summary = ", ".join(f"{kind}: " + " ".join(f"{k}={v}" for k, v in sorted(c.items()))
+                            for kind, c in sorted(counts.items()))
+        print(f"⏳ {summary}")
+        time.sleep(POLL_SECONDS)
+
+    assemble(queue)
+    queue.set_meta(state="done")
+    queue.close()
+
+def assemble(queue):
+    section = queue.get_meta("section")
+    root_url = queue.get_meta("root_url")
+
+    tree = build_tree_from_links(queue.urls("links"), root_url)
+    save_to_json(tree, f"structure/{section}_structure.json")
+
+    pages = 0
+    for url, html, text, markdown, pdfs in queue.pages():
+        if html:
+            save_html(url, html)
+        if text:
+            save_text(url, text, pdfs)
+        if markdown:
+            save_markdown(url, markdown)
+        pages += 1
+
+    # Workers don't write to output/, so their bodies are archived here;
+    # reprocess.py and later single-node runs then see these pages too
+    archive = get_archive()
+    for url, body, encoding in queue.bodies():
+        archive.mark_processed(url, archive.store(url, body, encoding), EXTRACTOR_VERSION)
+
+    failed = {kind: c.get("failed", 0) for kind, c in queue.counts().items()}
+    print(f"✅ Assembled {pages} pages from the work queue (failed: {failed})")
+
+def heartbeat_loop(db_path, worker, stop):
+    # Separate connection: sqlite3 connections aren't shared across threads
+    queue = WorkQueue(db_path)
+    while not stop.wait(LEASE_SECONDS / 3):
+        queue.heartbeat(worker)
+    queue.close()
+
+def handle_links(queue, worker, url, depth):
+    root_path = queue.get_meta("root_path")
+    max_depth = queue.get_meta("max_depth")
+
+    status, links = fetch_nested_links(url, root_path)
+    if status != 200:
+        queue.fail("links", url, worker, f"HTTP {status}", retryable=is_retryable_status(status))
+        return
+    if max_depth is None or depth < max_depth:
+        queue.add("links", links, depth + 1)
+    if queue.get_meta("extract", True):
+        queue.add("content", [url], depth)
+    queue.complete("links", url, worker)
+
+def handle_content(queue, worker, url):
+    status, body, encoding = fetch(url, timeout=10)
+    if status != 200:
+        queue.fail("content", url, worker, f"HTTP {status}", retryable=is_retryable_status(status))
+        return
+    html, text, pdfs, markdown = parse_main_content(body, encoding)
+    queue.save_page(url, worker, html, text, markdown, pdfs, body, encoding)
+    queue.complete("content", url, worker)
+
+def run_worker(db_path, worker):
+    queue = WorkQueue(db_path)
+    queue.heartbeat(worker)
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat_loop, args=(db_path, worker, stop), daemon=True)
+    beat.start()
+    print(f"👷 Worker {worker} attached to {db_path}")
+
+    try:
+        while True:
+            jobs = queue.lease(worker, ["links", "content"])
+            if not jobs:
+                if queue.get_meta("state") == "done":
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+
+            kind, url, depth = jobs[0]
+            print(f"Visiting ({kind}): {url}")
+            try:
+                if kind == "links":
+                    handle_links(queue, worker, url, depth)
+                else:
+                    handle_content(queue, worker, url)
+            except Exception as e:
+                print(f"❌ Error: {e} at {url}")
+                queue.fail(kind, url, worker, e, retryable=isinstance(e, requests.RequestException))
+    finally:
+        stop.set()
+        beat.join()
+        queue.close()
+        print_totals()
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="role", required=True)
+
+    coordinator = sub.add_parser("coordinator")
+    coordinator.add_argument("--db", required=True, help="SQLite file on a volume shared by all nodes")
+    coordinator.add_argument("--section", default="find-help")
+    coordinator.add_argument("--max-depth", type=int)
+    coordinator.add_argument("--no-extract", action="store_true", help="only build the structure JSON")
+
+    worker = sub.add_parser("worker")
+    worker.add_argument("--db", required=True)
+    worker.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}")
+
+    args = parser.parse_args()
+    if args.role == "coordinator":
+        run_coordinator(args.db, args.section, args.max_depth, not args.no_extract)
+    else:
+        run_worker(args.db, args.name)
+
+if __name__ == "__main__":
+    main()
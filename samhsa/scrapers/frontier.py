@@ -0,0 +1,76 @@
+import time
+import heapq
+import itertools
+from collections import deque
+from urllib.parse import urlparse
+
+FRONTIER_MODES = ["bfs", "dfs", "priority"]
+
+# Lower sorts first in priority mode
+SOURCE_PRIORITY = {"sitemap": 0, "seed": 0, "link": 1}
+
+def path_depth(url):
+    return len([p for p in urlparse(url).path.split("/") if p])
+
+class Frontier:
+    # bfs:      FIFO, shallowest link depth first
+    # dfs:      LIFO, what crawl_all_nested_links used to do with list.pop()
+    # priority: sitemap/seed URLs first, then shortest URL path, then link depth
+
+    def __init__(self, mode="bfs"):
+        if mode not in FRONTIER_MODES:
+            raise ValueError(f"Unknown frontier mode: {mode}")
+        self.mode = mode
+        self.queued = set()
+        self.counter = itertools.count()
+        self.items = [] if mode == "priority" else deque()
+
+    def push(self, url, depth, source="link"):
+        if url in self.queued:
+            return
+        self.queued.add(url)
+        if self.mode == "priority":
+            key = (SOURCE_PRIORITY.get(source, 1), path_depth(url), depth, next(self.counter))
+            heapq.heappush(self.items, (key, url, depth))
+        else:
+            self.items.append((url, depth))
+
+    def pop(self):
+        if self.mode == "priority":
+            _, url, depth = heapq.heappop(self.items)
+        elif self.mode == "bfs":
+            url, depth = self.items.popleft()
+        else:
+            url, depth = self.items.pop()
+        self.queued.discard(url)
+        return url, depth
+
+    def __len__(self):
+        return len(self.items)
+
+class CrawlBudget:
+    # Counts the pages fetched in this run only; pages already known from a
+    # saved structure don't use any of it
+    def __init__(self, max_depth=None, max_pages=None, time_budget=None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.started = time.monotonic()
+        self.pages_fetched = 0
+
+    def limited(self):
+        return any(v is not None for v in (self.max_depth, self.max_pages, self.time_budget))
+
+    def can_expand(self, depth):
+        return self.max_depth is None or depth < self.max_depth
+
+    def page_fetched(self):
+        self.pages_fetched += 1
+
+    def exhausted(self, wait=0):
+        # wait: seconds the caller would sleep before its next fetch
+        if self.max_pages is not None and self.pages_fetched >= self.max_pages:
+            return f"page budget of {self.max_pages} reached"
+        if self.time_budget is not None and time.monotonic() + wait - self.started >= self.time_budget:
+            return f"time budget of {self.time_budget}s reached"
+        return None
@@ -1,13 +1,67 @@
 import os
+import sys
 import json
-import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
+import hashlib
+import argparse
 from urllib.parse import urlparse, urljoin
+from raw_archive import get_archive
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from retry_queue import get_queue, is_retryable_status
+import text_formatter
+import markdown_formatter
+from text_formatter import TextFormatter
+from markdown_formatter import MarkdownFormatter
+from lazy import lazy_import
+from fetch import fetch, get_session, iter_body, print_totals, MAX_PDF_BYTES
+
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
 
 BASE_URL = "https://www.samhsa.gov"
 CONTENT_SELECTOR = 'div#main[role=main]'
 HTML_DIR = 'output/html'
 TEXT_DIR = 'output/text'
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+FILTER_TEXT = {'body',
+               'intro',
+               'hero',
+               'expand all',
+               'collapse all',
+               'skip to main content',
+               'title', 'last updated',
+               'last updated:',
+               'spanish language toggle',
+               'español', 'breadcrumbs',
+               'your browser is not supported',
+               'switch to chrome, edge, firefox or safari',
+               'main page content',
+               'source'
+}
+
+# Loose strings outside p/li/headings have never been written for SAMHSA
+# pages (the old prefix check was always truthy), so loose_text stays off
+# to keep output/text unchanged.
+TEXT_FORMATTER = TextFormatter(BASE_URL, filter_text=FILTER_TEXT, loose_text=False,
+                               buttons=True, dedupe_links=True, collect_pdfs=True)
+MARKDOWN_FORMATTER = MarkdownFormatter(BASE_URL)
+
+# Bump when extraction changes in a way the fingerprint below can't see
+EXTRACTOR_REVISION = 1
+
+def extractor_version():
+    # Changes whenever the selector, the filter rules or the formatter code
+    # change, so reprocess.py knows which archived pages are out of date
+    digest = hashlib.sha256()
+    digest.update(str(EXTRACTOR_REVISION).encode())
+    digest.update(CONTENT_SELECTOR.encode())
+    digest.update('\n'.join(sorted(FILTER_TEXT)).encode())
+    for module in (text_formatter, markdown_formatter):
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+EXTRACTOR_VERSION = extractor_version()
 
 def download_pdf(pdf_url, output_folder):
     try:
@@ -18,14 +72,23 @@ def download_pdf(pdf_url, output_folder):
             # 'Referer': url,  # Optional but can help when the site checks origin
         }
         filename = pdf_url.split('/')[-1]
-        response = requests.get(pdf_url, headers=headers, timeout=10)
-        response.raise_for_status()
         pdf_path = os.path.join(output_folder, filename)
-        with open(pdf_path, 'wb') as f:
-            f.write(response.content)
+        with get_session().get(pdf_url, headers=headers, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            # Write to a temp file so a size-capped or dropped download
+            # never leaves a truncated PDF behind
+            with open(pdf_path + '.part', 'wb') as f:
+                for chunk in iter_body(response, pdf_url, MAX_PDF_BYTES):
+                    f.write(chunk)
+        os.replace(pdf_path + '.part', pdf_path)
         print(f"📥 Downloaded PDF: {pdf_url}")
+        get_queue().succeed("pdf", pdf_url)
     except Exception as e:
         print(f"❌ Failed to download {pdf_url}: {e}")
+        retryable = isinstance(e, requests.RequestException)
+        if isinstance(e, requests.HTTPError):
+            retryable = is_retryable_status(e.response.status_code)
+        get_queue().fail("pdf", pdf_url, e, retryable=retryable, output_folder=output_folder)
 
 def sanitize_path(url):
     path = urlparse(url).path.strip('/')
@@ -54,6 +117,16 @@ def save_text(url, text, pdfs):
     #     for pdf_url in pdfs:
     #         download_pdf(pdf_url, folder_path)
 
+def save_markdown(url, markdown):
+    rel_path = sanitize_path(url)
+    parts = rel_path.split('/')
+    folder_path = os.path.join(TEXT_DIR, *parts)
+    os.makedirs(folder_path, exist_ok=True)
+    out_path = os.path.join(folder_path, f"{parts[-1] or 'index'}.md")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(markdown)
+    print(f"📑 Saved Markdown: {out_path}")
+
 # def extract_main_content(url):
 #     try:
 #         print(f"Visiting: {url}")
@@ -73,131 +146,132 @@ def save_text(url, text, pdfs):
 
 
 
-def extract_main_content(url):
+def extract_main_content(url, record=None, page_info=None):
+    # page_info (section/parent_url/depth) rides along in the retry queue so
+    # a page recovered later still gets its dataset columns
+    page_info = page_info or {}
     try:
         print(f"Visiting: {url}")
-        resp = requests.get(url, timeout=10)
-        if resp.status_code != 200:
-            print(f"⚠️  Skipped (HTTP {resp.status_code}): {url}")
-            return None, None, None
-
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        main = soup.select_one(CONTENT_SELECTOR)
-
-        # Remove script and style tags
-        for tag in main.find_all(['script', 'style']):
-            tag.decompose()
+        status, body, encoding = fetch(url, timeout=10)
+        if status != 200:
+            print(f"⚠️  Skipped (HTTP {status}): {url}")
+            get_queue().fail("content", url, f"HTTP {status}",
+                             retryable=is_retryable_status(status), **page_info)
+            return None, None, None, None
 
-        text, pdfs = format_text(main)
+        body_hash = get_archive().store(url, body, encoding)
+        html, text, pdfs, markdown = parse_main_content(body, encoding, record)
         print(pdfs)
-        return str(main), text, pdfs
+        get_queue().succeed("content", url)
+        get_archive().mark_processed(url, body_hash, EXTRACTOR_VERSION)
+        return html, text, pdfs, markdown
 
     except Exception as e:
         print(f"❌ Error: {e} at {url}")
-        return None, None, None
+        get_queue().fail("content", url, e, retryable=isinstance(e, requests.RequestException), **page_info)
+        return None, None, None, None
+
+def parse_main_content(page_html, encoding=None, record=None):
+    soup = bs4.BeautifulSoup(page_html, 'html.parser', from_encoding=encoding)
+    main = soup.select_one(CONTENT_SELECTOR)
+
+    # Remove script and style tags
+    for tag in main.find_all(['script', 'style']):
+        tag.decompose()
+
+    html = str(main)
+    text, pdfs = format_text(main)
+    if record is not None:
+        record.update(page_outline(main))
+    return html, text, pdfs, format_markdown(main)
+
+def page_outline(main):
+    # Heading outline and outbound links for the dataset, in document order,
+    # from a single pass over the content
+    headings, links = [], []
+    for tag in main.find_all(HEADING_TAGS + ['a']):
+        if tag.name != 'a':
+            headings.append((int(tag.name[1]), tag.get_text(' ', strip=True)))
+            continue
+        href = tag.get('href', '').strip()
+        if href and not href.startswith(('#', 'javascript:')):
+            links.append((urljoin(BASE_URL, href), tag.get_text(' ', strip=True)))
+    return {'headings': headings, 'links': links}
 
 def format_text(element):
-    lines = []
-    pdf_links = []
-    filter_text = {'body', 
-                   'intro', 
-                   'hero', 
-                   'expand all', 
-                   'collapse all', 
-                   'skip to main content', 
-                   'title', 'last updated', 
-                   'last updated:', 
-                   'spanish language toggle', 
-                   'español', 'breadcrumbs', 
-                   'your browser is not supported',
-                   'switch to chrome, edge, firefox or safari',
-                   'main page content',
-                   'source'
-    }
-
-    def recurse(node, indent=""):
-        if isinstance(node, NavigableString):
-            text = node.strip()
-            if text and text.lower() not in filter_text and not (text.startswith(f) for f in filter_text):
-                lines.append(indent + text)
-
-        elif isinstance(node, Tag):
-            name = node.name.lower()
-
-            if name in ['script', 'style', 'nav', 'footer']:
-                return  # skip
-
-            if name.startswith('h') and name[1:].isdigit():
-                heading = get_text_with_links(node).strip()
-                lines.append('\n' + heading)
-                lines.append('-' * len(heading))
-            elif name in ['button']:
-                lines.append('')
-                lines.append(f'(button) {indent + get_text_with_links(node)} (button)')
-            elif name in ['p']:
-                lines.append('')
-                lines.append(indent + get_text_with_links(node).strip())
-            elif name in ['ul', 'ol']:
-                for li in node.find_all('li', recursive=False):
-                    recurse(li, indent + "  ")
-            elif name == 'li':
-                lines.append(indent + "- " + get_text_with_links(node).strip())
-            else:
-                for child in node.children:
-                    recurse(child, indent)
-
-    def get_text_with_links(tag):
-        parts = []
-        seen_strings = set()
-        for child in tag.descendants:
-            if isinstance(child, NavigableString):
-                text = child.strip()
-                if text:
-                    parent = child.find_parent('a', href=True)
-                    if parent:
-                        full_url = urljoin(BASE_URL, parent['href'])
-                        combined = f"{text} ({full_url})"
-                        if combined not in seen_strings:
-                            seen_strings.add(combined)
-                            parts.append(combined)
-                            # parts.append(f"{text} ({full_url})")
-                    elif not parent:
-                        parts.append(text)
-                        seen_strings.add(text)
-            # if isinstance(child, NavigableString):
-            #     parts.append(child.strip())
-            elif isinstance(child, Tag) and child.name == 'a' and child.get('href'):
-                anchor = child.get_text(strip=True)
-                href = child['href']
-                full_url = urljoin(BASE_URL, href)
-                combined = f"{anchor} ({full_url})"
-                if combined not in seen_strings:
-                    seen_strings.add(combined)
-                    parts.append(f"{anchor} ({full_url})")
-                    if href.lower().endswith('pdf'):
-                        pdf_links.append(full_url)
-
-        return ' '.join(filter(None, parts))
-
-    recurse(element)
-    return "\n\n".join(line for line in lines if line.strip()), pdf_links
-
-
-def process_structure(structure):
+    return TEXT_FORMATTER.format(element)
+
+
+def format_markdown(element):
+    return MARKDOWN_FORMATTER.format(element)
+
+
+def process_page(url, dataset=None, **page_info):
+    record = {} if dataset is not None else None
+    html, text, pdfs, markdown = extract_main_content(url, record, page_info)
+    if html:
+        save_html(url, html)
+    if text:
+        save_text(url, text, pdfs)
+    if markdown:
+        save_markdown(url, markdown)
+    if dataset is not None and html:
+        dataset.add_page(url, text, pdfs, record, **page_info)
+
+def process_structure(structure, dataset=None, section=None, parent_url=None, depth=0):
     for url, children in structure.items():
-        html, text, pdfs = extract_main_content(url)
-        if html:
-            save_html(url, html)
-        if text:
-            save_text(url, text, pdfs)
+        # The top-level pages of the tree name the section
+        page_section = section or sanitize_path(url).split('/')[0]
+        process_page(url, dataset, section=page_section, parent_url=parent_url, depth=depth)
         if isinstance(children, dict):
-            process_structure(children)
+            process_structure(children, dataset, page_section, url, depth + 1)
+
+def retry_pending(dataset=None):
+    queue = get_queue()
+    queue.drain("content", lambda url, context: process_page(url, dataset, **context))
+    queue.drain("pdf", lambda url, context: download_pdf(url, context["output_folder"]))
+
+def retry_dead_letters(dataset=None):
+    queue = get_queue()
+    pages = queue.take_dead_letters("content")
+    pdfs = queue.take_dead_letters("pdf")
+    print(f"Retrying {len(pages)} dead-lettered pages and {len(pdfs)} PDFs...")
+    for entry in pages:
+        process_page(entry["url"], dataset, **entry["context"])
+    for entry in pdfs:
+        download_pdf(entry["url"], entry["context"]["output_folder"])
 
 def main():
-    with open("output/structure/communities_structure.json", "r", encoding="utf-8") as f:
-        structure = json.load(f)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--structure", default="output/structure/communities_structure.json")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="only re-process pages and PDFs from the dead-letter file")
+    parser.add_argument("--dataset", action="store_true",
+                        help="also write page and link rows to output/dataset/*.parquet")
+    args = parser.parse_args()
+
+    dataset = None
+    if args.dataset:
+        from dataset import DatasetWriter
+        # A retry run only revisits a few pages, so it updates their rows in
+        # the existing dataset instead of replacing it
+        dataset = DatasetWriter(site_netloc=urlparse(BASE_URL).netloc, merge=args.retry_failed)
+
+    completed = False
+    try:
+        if args.retry_failed:
+            retry_dead_letters(dataset)
+        else:
+            with open(args.structure, "r", encoding="utf-8") as f:
+                structure = json.load(f)
+            process_structure(structure, dataset)
 
-    process_structure(structure)
+        retry_pending(dataset)
+        completed = True
+    finally:
+        if dataset is not None:
+            dataset.close(replace=completed)
+    print_totals()
 
 if __name__ == "__main__":
     main()
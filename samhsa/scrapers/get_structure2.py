@@ -1,8 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import json
 import os
+import sys
+import xml.etree.ElementTree as ET
+import argparse
+from link_stream import stream_links
+from frontier import Frontier, CrawlBudget, FRONTIER_MODES
+from link_graph import LinkGraph, graph_dir, has_graph
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from retry_queue import get_queue, is_retryable_status
+from fetch import fetch, print_totals
+from sitemap import parse_sitemap
+from lazy import lazy_import
+
+requests = lazy_import('requests')
 
 BASE_URL = "https://www.samhsa.gov"
 blocked_extensions = [".pdf", ".csv", ".doc", ".docx", ".zip", ".xls", ".xlsx"]
@@ -17,57 +29,131 @@ def is_valid_nested_url(link, root_path):
     path = urlparse(link).path.rstrip("/")
     return path.startswith(root_path) and path != root_path and not is_file_url(link)
 
-def get_links_from_page(url, root_path):
+def get_links_from_page(url, root_path, graph=None):
     try:
         print(f"Visiting: {url}")
-        resp = requests.get(url, timeout=10)
-        if resp.status_code != 200:
+        status, links = fetch_nested_links(url, root_path, graph)
+        if status != 200:
+            get_queue().fail("links", url, f"HTTP {status}",
+                             retryable=is_retryable_status(status), root_path=root_path)
             return []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        get_queue().succeed("links", url)
+        return links
+    except Exception as e:
+        print(f"Error visiting {url}: {e}")
+        get_queue().fail("links", url, e, retryable=isinstance(e, requests.RequestException), root_path=root_path)
+        return []
 
-        # Search entire document for links to avoid missing nav items
-        anchors = soup.find_all("a", href=True)
-        links = set()
+def fetch_nested_links(url, root_path, graph=None):
+    # Stream hrefs out of the whole document (to avoid missing nav items)
+    # without building a soup; the download stops at the site footer. With a
+    # graph, the whole page is read and every outbound http(s) link is
+    # recorded there too, including the footer, off-site, out-of-section and
+    # file links that aren't crawled.
+    status, hrefs = stream_links(url, timeout=10, stop_at_footer=graph is None)
+    if status != 200:
+        return status, []
 
-        for tag in anchors:
-            href = tag["href"].split("#")[0].strip()
+    links = set()
+    outbound = set()
 
-            # Skip empty or JS links
-            if not href or href.startswith("javascript:") or href.startswith("mailto:"):
-                continue
+    for href in hrefs:
+        href = href.split("#")[0].strip()
 
-            full_url = normalize_url(urljoin(BASE_URL, href))
+        # Skip empty or JS links
+        if not href or href.startswith("javascript:") or href.startswith("mailto:"):
+            continue
+
+        full_url = normalize_url(urljoin(BASE_URL, href))
+        if full_url.startswith(("http://", "https://")):
+            outbound.add(full_url)
+
+        # Must stay within site
+        if not full_url.startswith(BASE_URL):
+            continue
 
-            # Must stay within site
-            if not full_url.startswith(BASE_URL):
-                continue
+        if is_valid_nested_url(full_url, root_path):
+            print(f"🔗 Found: {full_url}")
+            links.add(full_url)
 
-            if is_valid_nested_url(full_url, root_path):
-                print(f"🔗 Found: {full_url}")
-                links.add(full_url)
+    if graph is not None:
+        graph.add_page(normalize_url(url), sorted(outbound))
+    return status, sorted(links)
 
-        return sorted(links)
+def get_sitemap_links(root_path, sitemap_url=f"{BASE_URL}/sitemap.xml"):
+    try:
+        status, body, _ = fetch(sitemap_url, timeout=10)
+        if status != 200:
+            print(f"⚠️  No sitemap (HTTP {status}): {sitemap_url}")
+            return []
     except Exception as e:
-        print(f"Error visiting {url}: {e}")
+        print(f"Error fetching sitemap {sitemap_url}: {e}")
+        return []
+
+    try:
+        locs, child_sitemaps = parse_sitemap(body)
+    except ET.ParseError as e:
+        print(f"Error parsing sitemap {sitemap_url}: {e}")
         return []
 
-def crawl_all_nested_links(start_url, root_path):
-    visited = set()
-    to_visit = [start_url]
-    all_links = set()
+    links = set()
+    for child in child_sitemaps:
+        links.update(get_sitemap_links(root_path, child))
+    for loc in locs:
+        full_url = normalize_url(loc)
+        if full_url.startswith(BASE_URL) and is_valid_nested_url(full_url, root_path):
+            links.add(full_url)
+    return sorted(links)
+
+def crawl_all_nested_links(start_url, root_path, mode="bfs", budget=None, seeds=(), graph=None):
+    frontier = Frontier(mode)
+    budget = budget or CrawlBudget()
+    visited = {}
+
+    frontier.push(start_url, 0, source="seed")
+    for url in seeds:
+        frontier.push(url, 1, source="sitemap")
+    crawl_from(frontier, root_path, visited, budget, graph)
+    retry_failed_pages(root_path, frontier, visited, budget, graph)
 
-    while to_visit:
-        current = to_visit.pop()
+    return sorted(visited)
+
+def crawl_from(frontier, root_path, visited, budget, graph=None):
+    # visited maps url -> link depth from the start page
+    while frontier:
+        reason = budget.exhausted()
+        if reason:
+            print(f"⏹️  Stopping crawl: {reason} ({len(frontier)} URLs left in frontier)")
+            return
+        current, depth = frontier.pop()
         if current in visited:
             continue
-        visited.add(current)
-        all_links.add(current)
+        visited[current] = depth
+
+        budget.page_fetched()
+        children = get_links_from_page(current, root_path, graph)
+        if not budget.can_expand(depth):
+            continue
+        for link in children:
+            if link not in visited:
+                frontier.push(link, depth + 1)
 
-        children = get_links_from_page(current, root_path)
-        to_visit.extend([link for link in children if link not in visited])
+def retry_failed_pages(root_path, frontier, visited, budget, graph=None):
+    # Pages that failed during the crawl stay in visited; once one of them
+    # comes back, carry on crawling from its children. Retries left over
+    # when the budget runs out stay queued for the next run.
+    def retry(url, context):
+        depth = visited.get(url, 0)
+        budget.page_fetched()
+        children = get_links_from_page(url, root_path, graph)
+        if budget.can_expand(depth):
+            for link in children:
+                if link not in visited:
+                    frontier.push(link, depth + 1)
+        crawl_from(frontier, root_path, visited, budget, graph)
 
-    return sorted(all_links)
+    get_queue().drain("links", retry, stop=budget.exhausted, root_path=root_path)
 
 def insert_path(tree, full_url, root_path):
     rel_path = urlparse(full_url).path[len(root_path):].strip("/").split("/")
@@ -101,15 +187,89 @@ def save_to_json(data, filename):
         json.dump(data, f, indent=2)
     print(f"Saved to output/{filename}")
 
-def main():
-    section = "find-help"
-    print(f"Scraping {section} section...")
+def flatten_tree(tree):
+    links = []
+    for url, children in tree.items():
+        links.append(url)
+        if isinstance(children, dict):
+            links.extend(flatten_tree(children))
+    return links
+
+def load_structure_links(structure_file):
+    path = os.path.join("output", structure_file)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return flatten_tree(json.load(f))
+
+def recrawl_dead_letters(root_path, structure_file, mode="bfs", budget=None, graph=None):
+    budget = budget or CrawlBudget()
+    frontier = Frontier(mode)
+    visited = {url: 0 for url in load_structure_links(structure_file)}
+
+    dead = get_queue().take_dead_letters("links", root_path=root_path)
+    print(f"Retrying {len(dead)} dead-lettered pages...")
+    for entry in dead:
+        visited.pop(entry["url"], None)
+        frontier.push(entry["url"], 0, source="seed")
+    crawl_from(frontier, root_path, visited, budget, graph)
+    retry_failed_pages(root_path, frontier, visited, budget, graph)
+
+    return sorted(visited)
+
+def crawl_section(section, mode="bfs", budget=None, sitemap=False, retry_failed=False, graph=None):
+    # Crawls one section and writes output/structure/<section>_structure.json.
+    # Budgeted and retry runs only reach part of the section, so they are
+    # merged into the last saved structure instead of replacing it.
     root_url = f"{BASE_URL}/{section}"
     root_path = urlparse(root_url).path
+    structure_file = f"structure/{section}_structure.json"
+    budget = budget or CrawlBudget()
 
-    all_links = crawl_all_nested_links(root_url, root_path)
+    if retry_failed:
+        all_links = recrawl_dead_letters(root_path, structure_file, mode, budget, graph)
+    else:
+        seeds = get_sitemap_links(root_path) if sitemap else []
+        all_links = crawl_all_nested_links(root_url, root_path, mode, budget, seeds, graph)
+        if budget.limited():
+            # Partial refresh: keep pages from the last full crawl we didn't reach
+            all_links = sorted(set(all_links) | set(load_structure_links(structure_file)))
     tree = build_tree_from_links(all_links, root_url)
-    save_to_json(tree, f"structure/{section}_structure.json")
+    save_to_json(tree, structure_file)
+    return tree
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--section", default="find-help")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="only re-crawl pages from the dead-letter file and merge them into the saved structure")
+    parser.add_argument("--frontier", choices=FRONTIER_MODES, default="bfs")
+    parser.add_argument("--sitemap", action="store_true",
+                        help="seed the frontier with this section's URLs from sitemap.xml")
+    parser.add_argument("--max-depth", type=int, help="max link depth from the section page")
+    parser.add_argument("--max-pages", type=int, help="max pages to fetch")
+    parser.add_argument("--time-budget", type=float, help="stop crawling after this many seconds")
+    parser.add_argument("--graph", action="store_true",
+                        help="save the page-to-link graph to output/graph/<section> for link_check.py "
+                             "(budgeted and retry runs update the saved graph)")
+    args = parser.parse_args()
+
+    section = args.section
+    print(f"Scraping {section} section...")
+    budget = CrawlBudget(args.max_depth, args.max_pages, args.time_budget)
+    graph = LinkGraph() if args.graph else None
+
+    crawl_section(section, args.frontier, budget, args.sitemap, args.retry_failed, graph)
+    if graph is not None:
+        out_dir = graph_dir(section)
+        if (args.retry_failed or budget.limited()) and has_graph(out_dir):
+            # Only part of the section was fetched; update the saved graph
+            # rather than replacing it
+            saved = LinkGraph.load(out_dir)
+            saved.merge(graph)
+            graph = saved
+        graph.save(out_dir)
+    print_totals()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+# Checks every unique outbound URL in a saved link graph exactly once and
+# reports broken links, redirect chains and orphan pages.
+#   python scrapers/get_structure2.py --section find-help --graph
+#   python scrapers/link_check.py --section find-help [--internal-only] [--workers N]
+import os
+import sys
+import json
+import argparse
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from link_graph import LinkGraph, graph_dir
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from fetch import get_session, record, print_totals, POOL_SIZE
+
+BASE_URL = "https://www.samhsa.gov"
+MAX_REDIRECTS = 10
+# Servers that don't implement HEAD answer with one of these
+HEAD_UNSUPPORTED = {405, 501}
+
+def head(url, timeout):
+    session = get_session()
+    resp = session.head(url, timeout=timeout, allow_redirects=False)
+    if resp.status_code in HEAD_UNSUPPORTED:
+        resp.close()
+        # Headers only; closing the streamed response skips the body
+        resp = session.get(url, timeout=timeout, allow_redirects=False, stream=True)
+    record(url, resp, 0, False)
+    resp.close()
+    return resp
+
+def check_url(url, timeout=10):
+    # Follows redirects by hand so every hop of the chain is reported
+    chain = []
+    current = url
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = head(current, timeout)
+            location = resp.headers.get('Location')
+            if not (resp.is_redirect and location):
+                return {'url': url, 'status': resp.status_code, 'final_url': current,
+                        'redirects': chain, 'error': None}
+            chain.append({'url': current, 'status': resp.status_code})
+            current = urljoin(current, location)
+        error = f"more than {MAX_REDIRECTS} redirects"
+    except Exception as e:
+        error = str(e)
+    return {'url': url, 'status': None, 'final_url': current, 'redirects': chain, 'error': error}
+
+def is_broken(result):
+    return result['status'] is None or result['status'] >= 400
+
+def check_links(graph, workers=POOL_SIZE, internal_only=False, timeout=10):
+    urls = [graph.urls[node] for node in sorted(graph.linked_ids())]
+    if internal_only:
+        urls = [url for url in urls if url.startswith(BASE_URL)]
+    print(f"Checking {len(urls)} unique URLs from {graph.edge_count()} links on {workers} threads...")
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(check_url, url, timeout) for url in urls]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if is_broken(result):
+                print(f"❌ {result['status'] or result['error']}: {result['url']}")
+            if done % 1000 == 0:
+                print(f"⏳ {done}/{len(urls)} checked")
+    return sorted(results, key=lambda r: r['url'])
+
+def build_report(graph, results, root_url):
+    broken = [r for r in results if is_broken(r)]
+    redirected = [r for r in results if r['redirects'] and not is_broken(r)]
+    sources = graph.inbound(graph.ids[r['url']] for r in broken + redirected)
+
+    def with_sources(result):
+        return {**result, 'linked_from': sources[graph.ids[result['url']]]}
+
+    return {
+        'checked': len(results),
+        'broken': [with_sources(r) for r in broken],
+        'redirects': [with_sources(r) for r in redirected],
+        'orphans': graph.orphans(root_url),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--section", default="find-help")
+    parser.add_argument("--workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--internal-only", action="store_true", help=f"only check links under {BASE_URL}")
+    parser.add_argument("--timeout", type=float, default=10)
+    args = parser.parse_args()
+
+    out_dir = graph_dir(args.section)
+    graph = LinkGraph.load(out_dir)
+    results = check_links(graph, args.workers, args.internal_only, args.timeout)
+    report = build_report(graph, results, f"{BASE_URL}/{args.section}")
+
+    report_path = os.path.join(out_dir, 'link_check.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Checked {report['checked']} URLs: {len(report['broken'])} broken, "
+          f"{len(report['redirects'])} redirected, {len(report['orphans'])} orphan pages")
+    print(f"Saved to {report_path}")
+    print_totals()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+from array import array
+
+GRAPH_DIR = 'output/graph'
+
+class LinkGraph:
+    # Every URL seen during a crawl gets an integer ID; edges are kept as two
+    # parallel uint32 arrays (source ID, target ID) rather than per-page lists
+    # of strings, so hundreds of thousands of edges stay a few MB. Saved as:
+    #   <dir>/urls.txt   one URL per line, line number = ID
+    #   <dir>/edges.u32  source IDs then target IDs
+    #   <dir>/pages.u8   1 for IDs whose page was crawled, else 0
+
+    def __init__(self):
+        self.urls = []
+        self.ids = {}
+        self.sources = array('I')
+        self.targets = array('I')
+        self.crawled = bytearray()
+
+    def __len__(self):
+        return len(self.urls)
+
+    def node_id(self, url):
+        node = self.ids.get(url)
+        if node is None:
+            node = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+            self.crawled.append(0)
+        return node
+
+    def add_page(self, url, links):
+        source = self.node_id(url)
+        self.crawled[source] = 1
+        for link in links:
+            target = self.node_id(link)
+            if target != source:
+                self.sources.append(source)
+                self.targets.append(target)
+
+    def merge(self, other):
+        # Folds in a partial crawl: pages other crawled get other's outgoing
+        # edges in place of their old ones, every other page keeps its edges
+        recrawled = {self.node_id(other.urls[node]) for node in other.page_ids()}
+        kept = [(source, target) for source, target in zip(self.sources, self.targets)
+                if source not in recrawled]
+        self.sources = array('I', (source for source, _ in kept))
+        self.targets = array('I', (target for _, target in kept))
+        for source, target in zip(other.sources, other.targets):
+            self.sources.append(self.node_id(other.urls[source]))
+            self.targets.append(self.node_id(other.urls[target]))
+        for node in recrawled:
+            self.crawled[node] = 1
+
+    def edge_count(self):
+        return len(self.sources)
+
+    def page_ids(self):
+        return [node for node, crawled in enumerate(self.crawled) if crawled]
+
+    def linked_ids(self):
+        return set(self.targets)
+
+    def in_degree(self):
+        degree = array('I', bytes(4 * len(self.urls)))
+        for target in self.targets:
+            degree[target] += 1
+        return degree
+
+    def inbound(self, wanted):
+        # Pages linking to each of the wanted IDs, in one pass over the edges
+        found = {node: [] for node in wanted}
+        for source, target in zip(self.sources, self.targets):
+            if target in found:
+                found[target].append(self.urls[source])
+        return found
+
+    def orphans(self, root_url=None):
+        # Crawled pages nothing else in the crawl links to (they were only
+        # reached through the sitemap or a seed)
+        degree = self.in_degree()
+        root = self.ids.get(root_url)
+        return [self.urls[node] for node in self.page_ids() if degree[node] == 0 and node != root]
+
+    def save(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, 'urls.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(url + '\n' for url in self.urls)
+        with open(os.path.join(out_dir, 'edges.u32'), 'wb') as f:
+            self.sources.tofile(f)
+            self.targets.tofile(f)
+        with open(os.path.join(out_dir, 'pages.u8'), 'wb') as f:
+            f.write(self.crawled)
+        print(f"🕸️  Saved link graph ({len(self.urls)} URLs, {self.edge_count()} edges) to {out_dir}")
+
+    @classmethod
+    def load(cls, out_dir):
+        graph = cls()
+        with open(os.path.join(out_dir, 'urls.txt'), 'r', encoding='utf-8') as f:
+            graph.urls = f.read().splitlines()
+        graph.ids = {url: node for node, url in enumerate(graph.urls)}
+        edges = array('I')
+        with open(os.path.join(out_dir, 'edges.u32'), 'rb') as f:
+            edges.frombytes(f.read())
+        half = len(edges) // 2
+        graph.sources, graph.targets = edges[:half], edges[half:]
+        with open(os.path.join(out_dir, 'pages.u8'), 'rb') as f:
+            graph.crawled = bytearray(f.read())
+        return graph
+
+def has_graph(out_dir):
+    return os.path.exists(os.path.join(out_dir, 'urls.txt'))
+
+def graph_dir(section):
+    return os.path.join(GRAPH_DIR, section.replace('/', '_'))
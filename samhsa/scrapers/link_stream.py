@@ -0,0 +1,79 @@
+import os
+import sys
+import codecs
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from fetch import get_session, iter_body, declared_encoding, record, MAX_BODY_BYTES
+
+CHUNK_SIZE = 16 * 1024
+# Once the site footer opens we're past the page content, so the rest of the
+# download is skipped (site-wide footer links never nest under a section).
+# Only the site footer counts: <footer role="contentinfo">, or a <footer>
+# after </main>. Footers inside articles and cards don't stop the parse.
+STOP_AT_SITE_FOOTER = True
+
+class _StopParsing(Exception):
+    pass
+
+class LinkExtractor(HTMLParser):
+    # Collects <a href> values from HTMLParser events as chunks are fed in,
+    # without building a tree
+
+    def __init__(self, stop_at_footer=STOP_AT_SITE_FOOTER):
+        super().__init__(convert_charrefs=True)
+        self.stop_at_footer = stop_at_footer
+        self.after_main = False
+        self.hrefs = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.hrefs.append(value)
+                    break
+        elif tag == 'footer' and self.stop_at_footer:
+            if self.after_main or ('role', 'contentinfo') in attrs:
+                self.done = True
+                raise _StopParsing()
+
+    def handle_endtag(self, tag):
+        if tag == 'main':
+            self.after_main = True
+
+    def feed(self, data):
+        try:
+            super().feed(data)
+        except _StopParsing:
+            pass
+
+    def close(self):
+        try:
+            super().close()
+        except _StopParsing:
+            pass
+
+def stream_links(url, timeout=10, stop_at_footer=STOP_AT_SITE_FOOTER, chunk_size=CHUNK_SIZE, max_bytes=MAX_BODY_BYTES):
+    # Returns (status_code, hrefs). The body is only read for 200 responses,
+    # and only up to the site footer when stop_at_footer is set.
+    with get_session().get(url, timeout=timeout, stream=True) as resp:
+        if resp.status_code != 200:
+            record(url, resp, 0, False)
+            return resp.status_code, []
+
+        # The pages we crawl are UTF-8 unless the server says otherwise
+        decoder = codecs.getincrementaldecoder(declared_encoding(resp) or 'utf-8')(errors='replace')
+        parser = LinkExtractor(stop_at_footer)
+        body = iter_body(resp, url, max_bytes, chunk_size)
+        try:
+            for chunk in body:
+                parser.feed(decoder.decode(chunk))
+                if parser.done:
+                    break
+        finally:
+            body.close()
+        if not parser.done:
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+        return resp.status_code, parser.hrefs
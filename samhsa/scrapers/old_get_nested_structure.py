@@ -3,6 +3,7 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import json
 import os
+import argparse
 
 BASE_URL = "https://www.samhsa.gov"
 
@@ -67,10 +68,12 @@ def get_links(url, root_path):
         print(f"Error fetching {url}: {e}")
         return [], [], []
 
-def crawl_tree(url, root_path, visited, node):
+def crawl_tree(url, root_path, visited, node, depth=0, max_depth=None, max_pages=None):
     url = normalize_url(url)
     if url in visited:
         return
+    if max_pages is not None and len(visited) >= max_pages:
+        return
     visited.add(url)
 
     nested_links, stop_here, resources = get_links(url, root_path)
@@ -81,14 +84,16 @@ def crawl_tree(url, root_path, visited, node):
     }
 
     current = node[url]
+    expand = max_depth is None or depth < max_depth
 
     for link in nested_links:
-        if is_valid_internal_link(urlparse(link).path, root_path) and is_crawlable_page(link):
-            crawl_tree(link, root_path, visited, current)
+        if expand and is_valid_internal_link(urlparse(link).path, root_path) and is_crawlable_page(link):
+            crawl_tree(link, root_path, visited, current, depth + 1, max_depth, max_pages)
 
     for link in stop_here:
         if is_valid_internal_link(urlparse(link).path, root_path) and is_crawlable_page(link):
-            crawl_tree(link, root_path, visited, current)
+            if expand:
+                crawl_tree(link, root_path, visited, current, depth + 1, max_depth, max_pages)
         else:
             current["_stop_here"].append(link)
 
@@ -115,14 +120,19 @@ def save_structure_to_json(structure, section_name):
     print(f"Saved structure to {filename}")
 
 if __name__ == "__main__":
-    section = "substance-use/learn"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--section", default="substance-use/learn")
+    parser.add_argument("--max-depth", type=int, help="max link depth from the section page")
+    parser.add_argument("--max-pages", type=int, help="max pages to fetch")
+    args = parser.parse_args()
+
+    section = args.section
     start_url = f"{BASE_URL}/{section}"
     root_path = f"/{section}"
 
     visited = set()
     structure = {}
-    crawl_tree(start_url, root_path, visited, structure)
+    crawl_tree(start_url, root_path, visited, structure, max_depth=args.max_depth, max_pages=args.max_pages)
 
     print_structure_tree(structure)
     save_structure_to_json(structure, section)
-
@@ -0,0 +1,71 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+
+RAW_ARCHIVE = 'output/raw/raw_archive.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    encoding TEXT,
+    body BLOB NOT NULL,
+    body_hash TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    processed_hash TEXT,
+    processed_version TEXT
+);
+"""
+
+class RawArchive:
+    # Last fetched body for every content page, zlib-compressed, plus which
+    # body hash and extractor version output/ was last written from. That
+    # lets reprocess.py regenerate output/ without touching the network.
+
+    def __init__(self, path=RAW_ARCHIVE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def store(self, url, body, encoding):
+        body_hash = hashlib.sha256(body).hexdigest()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO pages (url, encoding, body, body_hash, fetched_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET encoding = excluded.encoding, body = excluded.body, "
+                "body_hash = excluded.body_hash, fetched_at = excluded.fetched_at",
+                (url, encoding, zlib.compress(body), body_hash, time.strftime('%Y-%m-%dT%H:%M:%S')))
+        return body_hash
+
+    def mark_processed(self, url, body_hash, version):
+        with self.conn:
+            self.conn.execute("UPDATE pages SET processed_hash = ?, processed_version = ? WHERE url = ?",
+                              (body_hash, version, url))
+
+    def stale(self, version, everything=False):
+        # (url, body_hash) for pages whose output was written from another
+        # body or another extractor version
+        if everything:
+            return self.conn.execute("SELECT url, body_hash FROM pages ORDER BY url").fetchall()
+        return self.conn.execute(
+            "SELECT url, body_hash FROM pages WHERE processed_hash IS NULL OR processed_hash != body_hash "
+            "OR processed_version IS NULL OR processed_version != ? ORDER BY url", (version,)).fetchall()
+
+    def load(self, url):
+        row = self.conn.execute("SELECT body, encoding, body_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None, None, None
+        return zlib.decompress(row[0]), row[1], row[2]
+
+_default_archive = None
+
+def get_archive():
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = RawArchive()
+    return _default_archive
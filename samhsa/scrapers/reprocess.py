@@ -0,0 +1,57 @@
+# Regenerates output/html and output/text from the raw bodies archived by
+# get_content.py, without any network access. Only pages whose archived
+# body or extractor version changed since they were last written are redone.
+#   python scrapers/reprocess.py [--all] [--workers N]
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from raw_archive import RawArchive, get_archive
+from get_content import EXTRACTOR_VERSION, parse_main_content, save_html, save_text, save_markdown
+
+def reprocess_page(url):
+    # Runs in a worker process, each with its own archive connection
+    try:
+        body, encoding, body_hash = get_archive().load(url)
+        html, text, pdfs, markdown = parse_main_content(body, encoding)
+        if html:
+            save_html(url, html)
+        if text:
+            save_text(url, text, pdfs)
+        if markdown:
+            save_markdown(url, markdown)
+        return url, body_hash, None
+    except Exception as e:
+        return url, None, e
+
+def reprocess(workers=None, everything=False):
+    archive = RawArchive()
+    stale = archive.stale(EXTRACTOR_VERSION, everything=everything)
+    workers = workers or os.cpu_count()
+    print(f"Reprocessing {len(stale)} archived pages with extractor {EXTRACTOR_VERSION} "
+          f"on {workers} processes...")
+
+    done = failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        urls = [url for url, _ in stale]
+        for url, body_hash, error in pool.map(reprocess_page, urls, chunksize=8):
+            if error is not None:
+                failed += 1
+                print(f"❌ Error: {error} at {url}")
+                continue
+            archive.mark_processed(url, body_hash, EXTRACTOR_VERSION)
+            done += 1
+
+    archive.close()
+    print(f"✅ Reprocessed {done} pages ({failed} failed)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true", help="reprocess every archived page")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    reprocess(args.workers, args.all)
+
+if __name__ == "__main__":
+    main()
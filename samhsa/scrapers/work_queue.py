@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from retry_queue import MAX_ATTEMPTS, BASE_DELAY, MAX_DELAY
+
+LEASE_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    PRIMARY KEY (kind, url)
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (kind, status, depth);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    heartbeat REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    worker TEXT,
+    html BLOB,
+    text BLOB,
+    markdown BLOB,
+    pdfs TEXT,
+    body BLOB,
+    encoding TEXT
+);
+"""
+# Columns added after the first release; queues created before them get
+# them on open
+PAGE_COLUMNS = {"body": "BLOB", "encoding": "TEXT"}
+
+def _pack(value):
+    return zlib.compress(value.encode('utf-8')) if value else None
+
+def _unpack(value):
+    return zlib.decompress(value).decode('utf-8') if value else None
+
+class WorkQueue:
+    # Frontier, visited set and extracted pages for a multi-node crawl, kept
+    # in one SQLite file on a volume every node can reach. A job row doubles
+    # as the visited marker: add() ignores URLs that already have a row.
+    # Leased jobs whose worker stops heartbeating go back to pending.
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        for column, column_type in PAGE_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE pages ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _immediate(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two nodes can't
+        # lease the same rows
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def set_meta(self, **values):
+        with self._immediate() as conn:
+            for key, value in values.items():
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def add(self, kind, urls, depth=0):
+        with self._immediate() as conn:
+            conn.executemany("INSERT OR IGNORE INTO jobs (kind, url, depth) VALUES (?, ?, ?)",
+                             [(kind, url, depth) for url in urls])
+
+    def lease(self, worker, kinds, limit=1):
+        # A pending row's lease_expires, if set, is a retry backoff: the row
+        # isn't handed out again until then
+        now = time.time()
+        placeholders = ",".join("?" for _ in kinds)
+        with self._immediate() as conn:
+            conn.execute("UPDATE jobs SET status = 'pending', worker = NULL, lease_expires = NULL "
+                         "WHERE status = 'leased' AND lease_expires < ?", (now,))
+            rows = conn.execute(
+                f"SELECT kind, url, depth FROM jobs WHERE status = 'pending' AND kind IN ({placeholders}) "
+                "AND (lease_expires IS NULL OR lease_expires <= ?) ORDER BY depth, rowid LIMIT ?",
+                (*kinds, now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE kind = ? AND url = ?",
+                [(worker, now + self.lease_seconds, kind, url) for kind, url, _ in rows])
+        return rows
+
+    def heartbeat(self, worker):
+        now = time.time()
+        with self._immediate() as conn:
+            conn.execute("INSERT OR REPLACE INTO workers (worker, heartbeat) VALUES (?, ?)", (worker, now))
+            conn.execute("UPDATE jobs SET lease_expires = ? WHERE status = 'leased' AND worker = ?",
+                         (now + self.lease_seconds, worker))
+
+    def complete(self, kind, url, worker):
+        with self._immediate() as conn:
+            conn.execute("UPDATE jobs SET status = 'done', lease_expires = NULL, error = NULL "
+                         "WHERE kind = ? AND url = ? AND worker = ?", (kind, url, worker))
+
+    def fail(self, kind, url, worker, error, retryable=True):
+        # Same backoff and attempt limit as the single-node RetryQueue
+        with self._immediate() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE kind = ? AND url = ? AND worker = ?",
+                               (kind, url, worker)).fetchone()
+            if row is None:
+                return  # lease was lost to another worker
+            attempts = row[0]
+            if retryable and attempts < MAX_ATTEMPTS:
+                retry_at = time.time() + min(BASE_DELAY * 2 ** (attempts - 1), MAX_DELAY)
+                conn.execute("UPDATE jobs SET status = 'pending', worker = NULL, lease_expires = ?, error = ? "
+                             "WHERE kind = ? AND url = ?", (retry_at, str(error), kind, url))
+            else:
+                conn.execute("UPDATE jobs SET status = 'failed', lease_expires = NULL, error = ? "
+                             "WHERE kind = ? AND url = ?", (str(error), kind, url))
+
+    def save_page(self, url, worker, html, text, markdown, pdfs, body=None, encoding=None):
+        # body is the fetched page as bytes, kept for the coordinator's raw archive
+        with self._immediate() as conn:
+            conn.execute("INSERT OR REPLACE INTO pages (url, worker, html, text, markdown, pdfs, body, encoding) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (url, worker, _pack(html), _pack(text), _pack(markdown), json.dumps(pdfs or []),
+                          zlib.compress(body) if body else None, encoding))
+
+    def counts(self):
+        counts = {}
+        for kind, status, n in self.conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status"):
+            counts.setdefault(kind, {})[status] = n
+        return counts
+
+    def unfinished(self):
+        row = self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')").fetchone()
+        return row[0]
+
+    def urls(self, kind):
+        return [row[0] for row in self.conn.execute("SELECT url FROM jobs WHERE kind = ? ORDER BY url", (kind,))]
+
+    def pages(self):
+        for url, html, text, markdown, pdfs in self.conn.execute(
+                "SELECT url, html, text, markdown, pdfs FROM pages ORDER BY url"):
+            yield url, _unpack(html), _unpack(text), _unpack(markdown), json.loads(pdfs)
+
+    def bodies(self):
+        for url, body, encoding in self.conn.execute(
+                "SELECT url, body, encoding FROM pages WHERE body IS NOT NULL ORDER BY url"):
+            yield url, zlib.decompress(body), encoding
@@ -1,24 +1,107 @@
 import os
+import hashlib
+from manifest import load_manifest, refresh_files
 
 BASE_S3_URL = "http://samhsa-website.s3-website-us-east-1.amazonaws.com"
-OUTPUT_DIR = "output"
+WEBSITE_DIR = "website"
 WEBSITE_INDEX = "website/index.html"
+# Everything under these is named by content hash, so it can be cached forever
+FRAGMENT_DIR = "website/fragments"
+STATIC_DIR = "website/static"
 
-accordion_id_counter = 0
+STYLE = """body { padding: 2rem; }
+ul { padding-left: 1rem; }
+.btn { font-size: 0.8rem; }
+"""
+
+# Each directory's accordion body is a separate fragment, fetched the first
+# time that directory is expanded
+LOADER = """document.addEventListener("show.bs.collapse", function (event) {
+  var body = event.target.querySelector(":scope > .accordion-body[data-fragment]");
+  if (!body || body.dataset.loaded) return;
+  body.dataset.loaded = "1";
+  fetch(body.dataset.fragment)
+    .then(function (resp) { return resp.text(); })
+    .then(function (html) { body.innerHTML = html; });
+});
+"""
+
+def digest(*parts, length=12):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:length]
+
+def template_version():
+    # Changes whenever this file (and so the markup) changes, which renames
+    # every fragment
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+TEMPLATE_VERSION = template_version()
+
+def accordion_id(content_type, rel_path):
+    # Derived from the path alone, so adding a file elsewhere never renumbers it
+    return f"acc-{digest(content_type, rel_path)}"
+
+class FragmentWriter:
+    # Writes website/fragments/<hash>.html, where the hash covers everything
+    # the fragment is rendered from: template version, path, entry names and
+    # the child fragments' names. An existing file with that name is already
+    # up to date and is reused without rendering.
+
+    def __init__(self, out_dir=FRAGMENT_DIR):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.existing = set(os.listdir(out_dir))
+        self.used = set()
+        self.rendered = 0
+        self.reused = 0
+
+    def fragment(self, node, content_type, rel_path=""):
+        # Children first: their names are part of this fragment's key
+        children = {}
+        for entry in sorted(node):
+            if isinstance(node[entry], dict):
+                rel_entry_path = f"{rel_path}/{entry}" if rel_path else entry
+                children[entry] = self.fragment(node[entry], content_type, rel_entry_path)
+
+        key = [TEMPLATE_VERSION, content_type, rel_path]
+        for entry in sorted(node):
+            key += [entry, children.get(entry, "")]
+        name = f"{digest(*key, length=16)}.html"
+
+        self.used.add(name)
+        if name in self.existing:
+            self.reused += 1
+        else:
+            with open(os.path.join(self.out_dir, name), "w", encoding="utf-8") as f:
+                f.write(generate_nested_accordion(node, content_type, rel_path, children))
+            self.existing.add(name)
+            self.rendered += 1
+        return name
+
+    def prune(self):
+        stale = self.existing - self.used
+        for name in stale:
+            os.remove(os.path.join(self.out_dir, name))
+        return len(stale)
 
 def generate_index():
     sections = []
 
+    # The saved manifest's file list, plus pages scraped since manifest.py
+    # last ran; output/manifest.json itself is left to manifest.py
+    manifest = refresh_files(load_manifest())
+
+    fragments = FragmentWriter()
     for content_type in ["text", "html"]:
-        path = os.path.join(OUTPUT_DIR, content_type)
-        if not os.path.exists(path):
+        tree = manifest_tree(manifest, content_type)
+        if not tree:
             continue
 
-        global accordion_id_counter
-        accordion_id = f"accordion-{accordion_id_counter}"
-        accordion_id_counter += 1
-
-        body = generate_nested_accordion(path, content_type)
+        fragment = fragments.fragment(tree, content_type)
         section = f"""
         <div class="accordion-item">
           <h2 class="accordion-header" id="heading-{content_type}">
@@ -27,35 +110,49 @@ def generate_index():
             </button>
           </h2>
           <div id="collapse-{content_type}" class="accordion-collapse collapse" aria-labelledby="heading-{content_type}" data-bs-parent="#rootAccordion">
-            <div class="accordion-body">
-              {body}
+            <div class="accordion-body" data-fragment="fragments/{fragment}">
             </div>
           </div>
         </div>
         """
         sections.append(section)
+    removed = fragments.prune()
 
-    html = build_html("\n".join(sections))
-    os.makedirs("website", exist_ok=True)
+    html = build_html("\n".join(sections), write_static_assets())
+    os.makedirs(WEBSITE_DIR, exist_ok=True)
     with open(WEBSITE_INDEX, "w", encoding="utf-8") as f:
         f.write(html)
 
-    print(f"✅ Wrote index to {WEBSITE_INDEX}")
+    print(f"✅ Wrote index to {WEBSITE_INDEX} ({fragments.rendered} fragments rendered, "
+          f"{fragments.reused} reused, {removed} removed)")
 
 
-def generate_nested_accordion(current_path, content_type, rel_path=""):
-    global accordion_id_counter
+def manifest_tree(manifest, content_type):
+    # Nested {name: subtree} dict of the manifest's files under content_type;
+    # files map to None
+    tree = {}
+    prefix = content_type + "/"
+    for rel in manifest["files"]:
+        if not rel.startswith(prefix):
+            continue
+        parts = rel[len(prefix):].split("/")
+        node = tree
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = None
+    return tree
+
 
-    entries = sorted(os.listdir(current_path))
+def generate_nested_accordion(node, content_type, rel_path, children):
+    # One directory level; subdirectories point at their own fragments
+    entries = sorted(node)
     html = ['<ul class="list-unstyled">']
 
     for entry in entries:
-        full_path = os.path.join(current_path, entry)
-        rel_entry_path = os.path.join(rel_path, entry).replace("\\", "/")
+        rel_entry_path = f"{rel_path}/{entry}" if rel_path else entry
 
-        if os.path.isdir(full_path):
-            acc_id = f"accordion-{accordion_id_counter}"
-            accordion_id_counter += 1
+        if isinstance(node[entry], dict):
+            acc_id = accordion_id(content_type, rel_entry_path)
             html.append(f'''
             <li>
               <div class="accordion" id="{acc_id}">
@@ -66,8 +163,7 @@ def generate_nested_accordion(current_path, content_type, rel_path=""):
                     </button>
                   </h2>
                   <div id="collapse-{acc_id}" class="accordion-collapse collapse" aria-labelledby="heading-{acc_id}" data-bs-parent="#{acc_id}">
-                    <div class="accordion-body">
-                      {generate_nested_accordion(full_path, content_type, rel_entry_path)}
+                    <div class="accordion-body" data-fragment="fragments/{children[entry]}">
                     </div>
                   </div>
                 </div>
@@ -88,19 +184,34 @@ def generate_nested_accordion(current_path, content_type, rel_path=""):
     return "\n".join(html)
 
 
-def build_html(body):
+def write_static_asset(name, ext, content):
+    filename = f"{name}.{digest(content)}.{ext}"
+    path = os.path.join(STATIC_DIR, filename)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    return f"static/{filename}"
+
+def write_static_assets():
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    assets = {"css": write_static_asset("archive", "css", STYLE),
+              "js": write_static_asset("archive", "js", LOADER)}
+    for name in os.listdir(STATIC_DIR):
+        if f"static/{name}" not in assets.values():
+            os.remove(os.path.join(STATIC_DIR, name))
+    return assets
+
+
+def build_html(body, assets):
     return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8" />
   <title>SAMHSA Scraper Index</title>
   <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet" />
+  <link href="{assets['css']}" rel="stylesheet" />
   <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-  <style>
-    body {{ padding: 2rem; }}
-    ul {{ padding-left: 1rem; }}
-    .btn {{ font-size: 0.8rem; }}
-  </style>
+  <script src="{assets['js']}" defer></script>
 </head>
 <body>
   <div class="container">
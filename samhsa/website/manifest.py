@@ -0,0 +1,169 @@
+import os
+import sys
+import glob
+import json
+import mmap
+import time
+import hashlib
+import argparse
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+OUTPUT_DIR = "output"
+CONTENT_DIRS = ["html", "text"]
+STRUCTURE_GLOB = "output/structure/*.json"
+MANIFEST_FILE = "output/manifest.json"
+HASH_WORKERS = 16
+MMAP_THRESHOLD = 1024 * 1024
+READ_CHUNK = 1024 * 1024
+MAX_AGE_DAYS = 30
+# The files a page is expected to have, per content dir
+PAGE_FILES = {"html": ".html", "text": ".txt"}
+
+def scan_files(root):
+    # Iterative os.scandir walk; DirEntry.stat() reuses what the directory
+    # listing already returned on most platforms
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat()
+                        yield entry.path, st.st_size, st.st_mtime
+        except FileNotFoundError:
+            continue
+
+def hash_file(path, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def content_files():
+    # (path relative to output/, path, size, mtime) for every content file
+    for content_type in CONTENT_DIRS:
+        for path, size, mtime in scan_files(os.path.join(OUTPUT_DIR, content_type)):
+            yield os.path.relpath(path, OUTPUT_DIR).replace("\\", "/"), path, size, mtime
+
+def build_manifest(previous=None, workers=HASH_WORKERS):
+    # Files whose size and mtime match the previous manifest keep their hash
+    previous_files = (previous or {}).get("files", {})
+    files = {}
+    to_hash = []
+
+    for rel, path, size, mtime in content_files():
+        files[rel] = {"size": size, "mtime": mtime}
+        old = previous_files.get(rel)
+        if old and old["size"] == size and old["mtime"] == mtime:
+            files[rel]["sha256"] = old["sha256"]
+        else:
+            to_hash.append((rel, path, size))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = pool.map(lambda job: hash_file(job[1], job[2]), to_hash)
+        for (rel, _, _), sha in zip(to_hash, hashes):
+            files[rel]["sha256"] = sha
+
+    print(f"Hashed {len(to_hash)} of {len(files)} files ({len(files) - len(to_hash)} unchanged)")
+    return {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "files": dict(sorted(files.items()))}
+
+def refresh_files(manifest):
+    # The saved manifest with its file list brought up to date, in memory
+    # only and without hashing: new files are listed by size and mtime until
+    # manifest.py next runs, deleted ones are dropped
+    previous_files = (manifest or {}).get("files", {})
+    files = {}
+    for rel, _, size, mtime in content_files():
+        files[rel] = previous_files.get(rel) or {"size": size, "mtime": mtime}
+    return {**(manifest or {}), "files": dict(sorted(files.items()))}
+
+def structure_urls():
+    urls = set()
+
+    def walk(tree):
+        for url, children in tree.items():
+            urls.add(url)
+            if isinstance(children, dict):
+                walk(children)
+
+    for path in glob.glob(STRUCTURE_GLOB):
+        with open(path, "r", encoding="utf-8") as f:
+            walk(json.load(f))
+    return urls
+
+def page_key(url):
+    # Same layout as save_html/save_text: <dir path>/<last segment>.<ext>
+    return urlparse(url).path.strip("/") or "index"
+
+def check_pages(manifest, max_age_days=MAX_AGE_DAYS):
+    files = manifest["files"]
+    expected = {page_key(url): url for url in structure_urls()}
+    cutoff = time.time() - max_age_days * 86400
+
+    missing, stale = [], []
+    for key, url in sorted(expected.items()):
+        name = key.split("/")[-1]
+        for content_type, ext in PAGE_FILES.items():
+            rel = f"{content_type}/{key}/{name}{ext}"
+            info = files.get(rel)
+            if info is None:
+                missing.append(rel)
+            elif info["mtime"] < cutoff:
+                stale.append(rel)
+
+    orphaned = []
+    for rel in files:
+        content_type, _, rest = rel.partition("/")
+        if os.path.dirname(rest) not in expected:
+            orphaned.append(rel)
+
+    return {"pages": len(expected), "missing": missing, "stale": stale, "orphaned": orphaned}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Wrote manifest to {path}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS)
+    parser.add_argument("--max-age-days", type=float, default=MAX_AGE_DAYS)
+    parser.add_argument("--full", action="store_true", help="rehash every file instead of reusing unchanged hashes")
+    parser.add_argument("--strict", action="store_true", help="exit non-zero if any page is missing")
+    args = parser.parse_args()
+
+    previous = None if args.full else load_manifest()
+    manifest = build_manifest(previous, args.workers)
+    report = check_pages(manifest, args.max_age_days)
+    manifest["report"] = report
+    save_manifest(manifest)
+
+    print(f"📋 {report['pages']} pages in structure, {len(manifest['files'])} files on disk")
+    for label in ["missing", "stale", "orphaned"]:
+        print(f"  {label}: {len(report[label])}")
+        for rel in report[label][:20]:
+            print(f"    {rel}")
+        if len(report[label]) > 20:
+            print(f"    ... and {len(report[label]) - 20} more")
+
+    if args.strict and report["missing"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
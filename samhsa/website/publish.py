@@ -0,0 +1,170 @@
+import os
+import gzip
+import hashlib
+import argparse
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BUCKET = "samhsa-website"
+OUTPUT_DIR = "output"
+WEBSITE_DIR = "website"
+WEBSITE_INDEX = "website/index.html"
+# Written by generate_archive.py under content-hashed names
+WEBSITE_ASSET_DIRS = ["fragments", "static"]
+PUBLISH_DIRS = ["html", "text"]
+MAX_WORKERS = 16
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+INDEX_CACHE = "no-cache"
+GZIP_TYPES = {"text/html", "text/plain", "text/markdown", "text/css", "application/javascript", "text/javascript", "application/json"}
+
+mimetypes.add_type("text/markdown", ".md")
+
+def walk_files(base, dirs):
+    files = []
+    for subdir in dirs:
+        root = os.path.join(base, subdir)
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, base).replace("\\", "/")
+                files.append((path, key))
+    return files
+
+def collect_files():
+    files = walk_files(OUTPUT_DIR, PUBLISH_DIRS)
+    files += walk_files(WEBSITE_DIR, WEBSITE_ASSET_DIRS)
+    if os.path.exists(WEBSITE_INDEX):
+        files.append((WEBSITE_INDEX, "index.html"))
+    return files
+
+def cache_control_for(key):
+    # Fragments and static assets change name when their content changes;
+    # index.html is the one entry point that has to be revalidated
+    if key == "index.html":
+        return INDEX_CACHE
+    if key.split("/")[0] in WEBSITE_ASSET_DIRS:
+        return IMMUTABLE_CACHE
+    return None
+
+def content_type_for(path):
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+def should_gzip(content_type):
+    return content_type.split(";")[0] in GZIP_TYPES
+
+def gzip_bytes(path):
+    with open(path, "rb") as f:
+        # mtime=0 keeps the output (and so the ETag) stable between runs
+        return gzip.compress(f.read(), mtime=0)
+
+def local_etag(path, data=None):
+    # Mirrors how S3 computes ETags: plain MD5 for single-part uploads,
+    # MD5 of the part MD5s plus "-<parts>" for multipart uploads
+    if data is not None:
+        return hashlib.md5(data).hexdigest()
+    if os.path.getsize(path) < MULTIPART_THRESHOLD:
+        with open(path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+    digests = []
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(MULTIPART_CHUNKSIZE), b""):
+            digests.append(hashlib.md5(chunk).digest())
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+def remote_etags(client, bucket):
+    etags = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket):
+        for obj in page.get("Contents", []):
+            etags[obj["Key"]] = obj["ETag"].strip('"')
+    return etags
+
+def upload_file(client, bucket, path, key, remote_etag, transfer_config):
+    content_type = content_type_for(path)
+    extra = {"ContentType": content_type}
+    cache_control = cache_control_for(key)
+    if cache_control:
+        extra["CacheControl"] = cache_control
+
+    if should_gzip(content_type):
+        body = gzip_bytes(path)
+        if local_etag(path, body) == remote_etag:
+            return key, False
+        client.put_object(Bucket=bucket, Key=key, Body=body, ContentEncoding="gzip", **extra)
+        return key, True
+
+    if local_etag(path) == remote_etag:
+        return key, False
+    # upload_file switches to a parallel multipart upload above the threshold
+    client.upload_file(path, bucket, key, ExtraArgs=extra, Config=transfer_config)
+    return key, True
+
+def publish(bucket, endpoint_url=None, workers=MAX_WORKERS, dry_run=False):
+    # boto3 takes a noticeable fraction of a second to import; only pay for
+    # it once we're actually publishing
+    import boto3
+    from botocore.config import Config
+    from boto3.s3.transfer import TransferConfig
+
+    # One client shared by every worker thread; its connection pool is sized
+    # to match so uploads don't queue on connections
+    client = boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=workers, retries={"max_attempts": 5, "mode": "adaptive"}),
+    )
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=4,
+    )
+
+    files = collect_files()
+    etags = remote_etags(client, bucket)
+    print(f"Publishing {len(files)} files to s3://{bucket} ({len(etags)} objects already there)")
+
+    if dry_run:
+        for path, key in files:
+            print(f"  {key}")
+        return
+
+    uploaded = skipped = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(upload_file, client, bucket, path, key, etags.get(key), transfer_config): key
+            for path, key in files
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                _, changed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ Failed to upload {key}: {e}")
+                continue
+            if changed:
+                uploaded += 1
+                print(f"⬆️  Uploaded: {key}")
+            else:
+                skipped += 1
+
+    print(f"✅ Uploaded {uploaded}, unchanged {skipped}, failed {failed}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bucket", default=BUCKET)
+    parser.add_argument("--endpoint-url", default=os.environ.get("S3_ENDPOINT_URL"),
+                        help="S3-compatible endpoint, e.g. http://localhost:9000 for MinIO or moto_server")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    publish(args.bucket, args.endpoint_url, args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()